@@ -0,0 +1,202 @@
+import json
+import numbers
+from typing import Callable
+
+import pandas as pd
+
+import sheet_diff
+from profiling import PROFILER
+from sheet_layout import build_format_requests, build_sheet_values
+from sheet_templates import TemplateSheets, new_sheet_id, usable
+from sheets_scheduler import SHEETS
+
+
+# === Cross-club batched export ===
+def _cell(v) -> dict:
+    if v is None or (isinstance(v, str) and v == ""):
+        return {}
+    if isinstance(v, bool):
+        return {"userEnteredValue": {"boolValue": v}}
+    if isinstance(v, numbers.Number):
+        f = float(v)
+        return {} if f != f else {"userEnteredValue": {"numberValue": f}}
+    return {"userEnteredValue": {"stringValue": str(v)}}
+
+
+def update_cells_request(sheet_id: int, row: int, col: int, rows: list[list]) -> dict:
+    return {
+        "updateCells": {
+            "start": {"sheetId": sheet_id, "rowIndex": row, "columnIndex": col},
+            "rows": [{"values": [_cell(v) for v in r]} for r in rows],
+            "fields": "userEnteredValue",
+        }
+    }
+
+
+def patch_requests(sheet_id: int, values: list[list], state: dict, threshold: int) -> list[dict] | None:
+    """Changed cells only, or None when the sheet's layout changed and it needs rebuilding."""
+    old_values = sheet_diff.grid_values(state)
+    if not sheet_diff.layout_unchanged(state, old_values, values, threshold):
+        return None
+    return [
+        update_cells_request(sheet_id, r, lo, [values[r][lo:hi + 1]])
+        for r, lo, hi in sheet_diff.changed_spans(old_values, values)
+    ]
+
+
+def club_requests(sheet_id: int, values: list[list], layout: dict, threshold: int,
+                  state: dict | None = None, incremental: bool = True) -> list[dict]:
+    """All batchUpdate requests that bring one club sheet up to date.
+
+    `state` is the existing sheet (from sheet_diff.fetch_sheet_states) or None
+    for a sheet added in the same batch.
+    """
+    if state is None:
+        return [update_cells_request(sheet_id, 0, 0, values)] + build_format_requests(sheet_id, layout, threshold)
+
+    if incremental:
+        patch = patch_requests(sheet_id, values, state, threshold)
+        if patch is not None:
+            return patch
+
+    # Rebuild in place: grow, strip old styling and values, write, restyle
+    requests = []
+    grow = sheet_diff.grow_grid_request(state, len(values) + 50, len(values[0]) + 10)
+    if grow is not None:
+        requests.append(grow)
+    requests += sheet_diff.reset_format_requests(state)
+    requests.append({"updateCells": {"range": {"sheetId": sheet_id}, "fields": "userEnteredValue"}})
+    requests.append(update_cells_request(sheet_id, 0, 0, values))
+    requests += build_format_requests(sheet_id, layout, threshold)
+    return requests
+
+
+def sheet_order_requests(existing: dict[str, dict], titles: list[str], sheet_ids: dict[str, int]) -> list[dict]:
+    """Move the club sheets (in `titles` order) after all other sheets, if not already there.
+
+    `titles` is every club title in CLUBS order, exported this time or not, so
+    a club left out of a batch keeps its place. `existing` maps title -> sheet
+    properties; `sheet_ids` gives the ids of the batch's sheets (titles missing
+    from `existing` are sheets about to be appended). Titles in neither are
+    skipped. A sheet only ever moves towards the front, where the API reads
+    its index the same before and after the move.
+    """
+    ids = {t: p["sheetId"] for t, p in existing.items()} | sheet_ids
+    current = [p["title"] for p in sorted(existing.values(), key=lambda p: p["index"])]
+    current += [t for t in titles if t in sheet_ids and t not in existing]
+    clubs = [t for t in titles if t in ids]
+    club_set = set(clubs)
+    wanted = [t for t in current if t not in club_set] + clubs
+
+    requests = []
+    for index, title in enumerate(wanted):
+        if current[index] != title:
+            current.remove(title)  # found after `index`: everything before it is in place
+            current.insert(index, title)
+            requests.append({"updateSheetProperties": {"properties": {"sheetId": ids[title], "index": index},
+                                                       "fields": "index"}})
+    return requests
+
+
+def order_club_sheets(gc, spreadsheet_id: str, titles: list[str]) -> None:
+    """Restore `titles` order after sheets were added concurrently (missing titles are skipped)."""
+    ss = SHEETS.call("read", gc.open_by_key, spreadsheet_id)
+    meta = SHEETS.call("read", ss.fetch_sheet_metadata, params={"fields": "sheets.properties(sheetId,title,index)"})
+    existing = {s["properties"]["title"]: s["properties"] for s in meta.get("sheets", [])}
+    requests = sheet_order_requests(existing, titles, {})
+    if requests:
+        SHEETS.call("write", ss.batch_update, {"requests": requests})
+
+
+def club_sheet_requests(title: str, values: list[list], layout: dict, threshold: int, state: dict | None,
+                        used_ids: set[int], cloner: TemplateSheets | None = None,
+                        mode: str = "incremental") -> tuple[int, list[dict]]:
+    """(sheet id, requests) that add club sheet `title`, or bring it up to date.
+
+    `state` is the existing sheet (sheet_diff.fetch_sheet_states) or None; a
+    new sheet gets an id not in `used_ids` and is appended. With a `cloner`,
+    new and rebuilt sheets are copies of its template sheets.
+    """
+    if cloner is not None and usable(layout):
+        patch = patch_requests(state["properties"]["sheetId"], values, state, threshold) \
+            if state is not None and mode == "incremental" else None
+        if patch is not None:
+            return state["properties"]["sheetId"], patch
+        sheet_id, requests = cloner.clone(title, layout, threshold)
+        return sheet_id, requests + [update_cells_request(sheet_id, 0, 0, values)]
+    if state is not None:
+        sheet_id = state["properties"]["sheetId"]
+        return sheet_id, club_requests(sheet_id, values, layout, threshold, state=state,
+                                       incremental=(mode == "incremental"))
+
+    sheet_id = new_sheet_id(used_ids)
+    if cloner is not None:
+        cloner.appended(title, sheet_id)
+    add = {"addSheet": {"properties": {
+        "sheetId": sheet_id, "title": title,
+        "gridProperties": {"rowCount": max(len(values) + 50, 120), "columnCount": max(len(values[0]) + 10, 26)},
+    }}}
+    return sheet_id, [add] + club_requests(sheet_id, values, layout, threshold)
+
+
+ClubFrame = pd.DataFrame | Callable[[], pd.DataFrame] | tuple[list[list], dict]
+
+
+def _sheet_values(frame: ClubFrame) -> tuple[list[list], dict]:
+    if callable(frame):
+        frame = frame()
+    if isinstance(frame, pd.DataFrame):
+        return build_sheet_values(frame)
+    return frame  # (values, layout) already built, e.g. in a worker process
+
+
+def export_clubs_batched(gc, spreadsheet_id: str, clubs: list[tuple[str, ClubFrame, int]],
+                         mode: str = "incremental", templates: bool = False,
+                         on_values: Callable[[str, tuple[list[list], dict]], None] | None = None,
+                         order: list[str] | None = None) -> int:
+    """Export every (title, frame, threshold) in a handful of Sheets API calls.
+
+    A frame may also be a zero-argument callable, called when that club's
+    requests are built (so only one such frame is alive at a time), or the
+    (values, layout) pair build_sheet_values would return. Club sheets
+    end up after any other sheets, in `order`: every club title of the
+    spreadsheet, so clubs not in this batch keep their place (defaults to
+    the order given). With `templates`, new and rebuilt sheets are copies of
+    pre-styled template sheets (see sheet_templates). `on_values(title,
+    (values, layout))` sees each club's rows as they are built. Returns the
+    number of Sheets API calls made.
+    """
+    with PROFILER.span("sheets.open"):
+        ss = SHEETS.call("read", gc.open_by_key, spreadsheet_id)
+        meta = SHEETS.call("read", ss.fetch_sheet_metadata, params={"fields": "sheets.properties(sheetId,title,index)"})
+    existing = {s["properties"]["title"]: s["properties"] for s in meta.get("sheets", [])}
+    calls = 2
+
+    titles = [title for title, _, _ in clubs]
+    with PROFILER.span("sheets.read"):
+        states = SHEETS.call("read", sheet_diff.fetch_sheet_states, ss, [t for t in titles if t in existing])
+    calls += 1 if states else 0
+
+    used_ids = {p["sheetId"] for p in existing.values()}
+    cloner = TemplateSheets(existing, used_ids) if templates else None
+    requests, sheet_ids = [], {}
+    for title, df, threshold in clubs:
+        values, layout = _sheet_values(df)
+        if on_values is not None:
+            on_values(title, (values, layout))
+        sheet_ids[title], club = club_sheet_requests(title, values, layout, threshold, states.get(title),
+                                                     used_ids, cloner=cloner, mode=mode)
+        requests += club
+
+    # Keep club sheets in order, after the other sheets (new sheets are appended)
+    requests += sheet_order_requests(cloner.sheets if cloner is not None else existing, order or titles, sheet_ids)
+    if cloner is not None:
+        requests += cloner.cleanup_requests()
+
+    if requests:
+        with PROFILER.span("sheets.batch_update", requests=len(requests)) as sp:
+            SHEETS.call("write", ss.batch_update, {"requests": requests})
+            if PROFILER.enabled:
+                sp["bytes"] = len(json.dumps(requests))
+        calls += 1
+    return calls
@@ -0,0 +1,86 @@
+"""Compare the pandas and numpy build_dataframe engines on synthetic clubs.
+
+    python benchmarks/bench_frame_engine.py --clubs 200 --members 30 --days 60
+    python benchmarks/bench_frame_engine.py --save-baseline benchmarks/baseline_frame_engine.json
+    python benchmarks/bench_frame_engine.py --baseline benchmarks/baseline_frame_engine.json
+
+Exits non-zero when the engines disagree, when the numpy engine is not faster
+than pandas, or when it regressed more than --max-regression over the baseline.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_engine import build_dataframe_numpy, build_dataframe_pandas  # noqa: E402
+from benchmarks.synthetic import club_payloads  # noqa: E402
+
+ENGINES = {"pandas": build_dataframe_pandas, "numpy": build_dataframe_numpy}
+
+
+def time_engine(fn, payloads: list[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for p in payloads:
+            fn(p)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clubs", type=int, default=100)
+    parser.add_argument("--members", type=int, default=30)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, help="fail if slower than this saved result")
+    parser.add_argument("--save-baseline", type=Path, help="write this run's timings as the baseline")
+    parser.add_argument("--max-regression", type=float, default=1.25, help="allowed slowdown vs the baseline")
+    args = parser.parse_args()
+
+    payloads = club_payloads(args.clubs, args.members, args.days, seed=args.seed)
+    rows = sum(len(p["club_friend_history"]) for p in payloads)
+
+    # Identical output first — a fast wrong answer is not a result
+    for i, p in enumerate(payloads):
+        try:
+            pd.testing.assert_frame_equal(build_dataframe_pandas(p), build_dataframe_numpy(p), check_exact=True)
+        except AssertionError as e:
+            print(f"❌ Engines disagree on club #{i}: {e}")
+            return 1
+
+    timings = {name: time_engine(fn, payloads, args.repeat) for name, fn in ENGINES.items()}
+    print(f"{args.clubs} clubs × {args.members} members × {args.days} days ({rows:,} history rows)")
+    print(f"{'engine':<8} {'total s':>9} {'ms/club':>9} {'speedup':>8}")
+    for name, secs in timings.items():
+        print(f"{name:<8} {secs:>9.3f} {secs / args.clubs * 1000:>9.2f} {timings['pandas'] / secs:>7.1f}x")
+
+    failed = False
+    if timings["numpy"] >= timings["pandas"]:
+        print("❌ numpy engine is not faster than pandas")
+        failed = True
+
+    key = f"{args.clubs}x{args.members}x{args.days}"
+    if args.baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text()).get(key)
+        if baseline and timings["numpy"] > baseline["numpy"] * args.max_regression:
+            print(f"❌ numpy engine regressed: {timings['numpy']:.3f}s vs baseline {baseline['numpy']:.3f}s")
+            failed = True
+
+    if args.save_baseline:
+        saved = json.loads(args.save_baseline.read_text()) if args.save_baseline.exists() else {}
+        saved[key] = timings
+        args.save_baseline.write_text(json.dumps(saved, indent=2))
+        print(f"Baseline saved to {args.save_baseline}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
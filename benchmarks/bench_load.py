@@ -0,0 +1,346 @@
+"""End-to-end load test: the headless ALL-clubs run against local ChronoGenesis and Sheets stand-ins.
+
+    python benchmarks/bench_load.py --clubs 7 100 1000
+    python benchmarks/bench_load.py --clubs 50 --latency 300 --fail-rate 0.05 --sheets-quota 60
+    python benchmarks/bench_load.py --clubs 100 -- --no-batch --workers 2      # main.py flags after --
+    python benchmarks/bench_load.py --save-baseline benchmarks/baseline_load.json
+    python benchmarks/bench_load.py --baseline benchmarks/baseline_load.json
+
+Each club count is one `main_updated` run (`--club all --fetch-mode http
+--no-cache --force --profile`) in a fresh interpreter, against:
+
+- a local club_profile server in this process, serving a synthetic payload per
+  circle_id after `--latency` ms (±50% jitter) and failing `--fail-rate` of the
+  calls with HTTP 500;
+- an in-memory stand-in for the gspread client and spreadsheet, which records
+  every call and batchUpdate request, answers after `--sheets-latency` ms and
+  returns HTTP 429 above `--sheets-quota` reads or writes per minute. main.py
+  paces itself to the same quota.
+
+The report covers clubs/minute, p50 / p95 ms per profiled stage, club_profile
+and Sheets call counts, and the run's peak memory. Peak memory is the max RSS
+of the main process, or traced Python memory where `resource` is missing
+(Windows). With --baseline, the run exits non-zero when clubs/minute dropped
+more than --max-regression.
+"""
+import argparse
+import functools
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from benchmarks.synthetic import club_payload  # noqa: E402
+
+RESULT_MARK = "BENCH_LOAD_RESULT "
+
+
+# === Stand-in for chronogenesis.net/api/club_profile ===
+def serve_clubs(members: int, days: int, latency: float, fail_rate: float, seed: int = 0) -> ThreadingHTTPServer:
+    """Local club_profile server; `server.stats` counts the answers by HTTP status."""
+    rnd = random.Random(seed)
+    lock = threading.Lock()
+
+    @functools.lru_cache(maxsize=None)
+    def body(circle_id: str) -> bytes:
+        n = int(circle_id.removeprefix("load") or 0)
+        return json.dumps(club_payload(members, days, seed=seed + n)).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+        def do_GET(self):
+            circle_id = parse_qs(urlparse(self.path).query).get("circle_id", [""])[0]
+            with lock:
+                delay = latency * rnd.uniform(0.5, 1.5)
+                failed = rnd.random() < fail_rate
+            time.sleep(delay)
+            status, payload = (500, b'{"error": "synthetic failure"}') if failed else (200, body(circle_id))
+            with lock:
+                server.stats[status] += 1
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.stats = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# === Stand-in for the gspread client (runs in the child) ===
+def _quota_error():
+    import requests
+    from gspread.exceptions import APIError
+
+    resp = requests.Response()
+    resp.status_code = 429
+    resp._content = json.dumps({"error": {"code": 429, "message": "Quota exceeded (bench_load)",
+                                          "status": "RESOURCE_EXHAUSTED"}}).encode("utf-8")
+    return APIError(resp)
+
+
+class FakeWorksheet:
+    def __init__(self, book: "FakeSheets", props: dict):
+        self.book, self.id, self.title = book, props["sheetId"], props["title"]
+        self.index = book.titles().index(self.title)
+
+    def update(self, values, range_name=None):
+        self.book.call("write", "update", values)
+
+    def batch_update(self, data):
+        self.book.call("write", "values_batch_update", data)
+
+
+class FakeSheets:
+    """One in-memory spreadsheet behind the gspread client calls main.py makes.
+
+    Sheets are tracked by id, title and order only (enough for every path to
+    run on a fresh spreadsheet); values and formats are counted, not kept. Calls
+    over `quota` per kind in any 60 s window fail with a gspread 429 APIError.
+    """
+
+    def __init__(self, quota: int, latency: float):
+        self.quota, self.latency = quota, latency
+        self.lock = threading.Lock()
+        self.sheets: list[dict] = []
+        self.calls: Counter = Counter()
+        self.requests: Counter = Counter()
+        self.rejected = 0
+        self.bytes = 0
+        self._window = {"read": deque(), "write": deque()}
+
+    def titles(self) -> list[str]:
+        return [p["title"] for p in self.sheets]
+
+    def call(self, kind: str, method: str, payload=None) -> None:
+        time.sleep(self.latency)
+        with self.lock:
+            now, window = time.monotonic(), self._window[kind]
+            while window and now - window[0] >= 60:
+                window.popleft()
+            if len(window) >= self.quota:
+                self.rejected += 1
+                raise _quota_error()
+            window.append(now)
+            self.calls[kind] += 1
+            self.calls[method] += 1
+            if payload is not None:
+                self.bytes += len(json.dumps(payload, default=str))
+
+    # gspread.Client
+    def open_by_key(self, key: str) -> "FakeSheets":
+        self.call("read", "open_by_key")
+        return self
+
+    # gspread.Spreadsheet
+    def fetch_sheet_metadata(self, params=None) -> dict:
+        self.call("read", "fetch_sheet_metadata")
+        with self.lock:
+            return {"sheets": [{"properties": {**p, "index": i}} for i, p in enumerate(self.sheets)]}
+
+    def worksheets(self) -> list[FakeWorksheet]:
+        self.call("read", "worksheets")
+        with self.lock:
+            return [FakeWorksheet(self, p) for p in self.sheets]
+
+    def add_worksheet(self, title: str, rows: int, cols: int) -> FakeWorksheet:
+        self.call("write", "add_worksheet")
+        with self.lock:
+            sheet_id = max((p["sheetId"] for p in self.sheets), default=0) + 1
+            self.sheets.append({"sheetId": sheet_id, "title": title})
+            return FakeWorksheet(self, self.sheets[-1])
+
+    def del_worksheet(self, ws: FakeWorksheet) -> None:
+        self.call("write", "del_worksheet")
+        with self.lock:
+            self.sheets = [p for p in self.sheets if p["sheetId"] != ws.id]
+
+    def batch_update(self, body: dict) -> dict:
+        self.call("write", "batch_update", body)
+        with self.lock:
+            for request in body["requests"]:
+                (kind, value), = request.items()
+                self.requests[kind] += 1
+                self._apply(kind, value)
+        return {}
+
+    def _apply(self, kind: str, value: dict) -> None:
+        by_id = {p["sheetId"]: p for p in self.sheets}
+        if kind == "addSheet":
+            props = value["properties"]
+            self.sheets.insert(props.get("index", len(self.sheets)), {"sheetId": props["sheetId"], "title": props["title"]})
+        elif kind == "duplicateSheet":
+            self.sheets.insert(value["insertSheetIndex"], {"sheetId": value["newSheetId"], "title": value["newSheetName"]})
+        elif kind == "deleteSheet":
+            self.sheets.remove(by_id[value["sheetId"]])
+        elif kind == "updateSheetProperties" and "index" in value["properties"]:
+            props = by_id[value["properties"]["sheetId"]]
+            self.sheets.remove(props)
+            self.sheets.insert(value["properties"]["index"], props)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+def child(opts: dict) -> dict:
+    """One headless ALL-clubs run of main.py against the stand-ins; returns its measurements."""
+    import asyncio
+    import shutil
+    import tempfile
+    import tracemalloc
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        resource = None
+    if resource is None:
+        tracemalloc.start()
+
+    import main
+
+    base = Path(tempfile.mkdtemp(prefix="bench_load_"))
+    sheets = FakeSheets(opts["sheets_quota"], opts["sheets_latency"])
+    main.resolve_base_dir = lambda: base
+    main.get_gc = lambda: sheets
+    main.SHEETS_READS_PER_MIN = main.SHEETS_WRITES_PER_MIN = opts["sheets_quota"]
+    main.CLUBS = {
+        str(i): {"title": f"Club {i:04d}", "URL": f"https://chronogenesis.net/club_profile?circle_id=load{i}",
+                 "THRESHOLD": 1_000_000 + (i % 5) * 500_000}
+        for i in range(1, opts["clubs"] + 1)
+    }
+    args = main.parse_args(["--club", "all", "--fetch-mode", "http", "--api-url", opts["api_url"],
+                            "--no-cache", "--force", "--profile", *opts["main_args"]])
+
+    t0 = time.perf_counter()
+    try:
+        asyncio.run(main.main_updated(args))
+        wall = time.perf_counter() - t0
+        records = [json.loads(line) for path in sorted((base / main.PROFILE_DIR).glob("*.jsonl"))
+                   for line in path.read_text(encoding="utf-8").splitlines()]
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+    else:
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+
+    durations: dict[str, list[float]] = {}
+    for rec in records:
+        if "duration_ms" in rec:
+            durations.setdefault(rec["stage"], []).append(rec["duration_ms"])
+    exported = sum(title in sheets.titles() for title in (c["title"] for c in main.CLUBS.values()))
+    return {
+        "clubs": opts["clubs"], "exported": exported, "wall_s": wall, "clubs_per_min": exported / wall * 60,
+        "peak_mb": peak,
+        "stages": {stage: {"n": len(d), "p50": _percentile(d, 0.5), "p95": _percentile(d, 0.95), "total": sum(d)}
+                   for stage, d in durations.items()},
+        "retries": sum(rec["stage"].endswith(".retry") for rec in records),
+        "sheets_calls": dict(sheets.calls), "sheets_requests": sum(sheets.requests.values()),
+        "sheets_rejected": sheets.rejected, "sheets_bytes": sheets.bytes,
+    }
+
+
+def run_child(opts: dict) -> dict:
+    env = {**os.environ, "PYTHONIOENCODING": "utf-8"}
+    out = subprocess.run([sys.executable, __file__, "--child", json.dumps(opts)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, encoding="utf-8", errors="replace")
+    lines = [line for line in out.stdout.splitlines() if line.startswith(RESULT_MARK)]
+    if out.returncode != 0 or not lines:
+        raise RuntimeError(f"load run with {opts['clubs']} clubs failed:\n{out.stderr[-3000:] or out.stdout[-3000:]}")
+    return json.loads(lines[-1][len(RESULT_MARK):])
+
+
+def report(result: dict, fetches: Counter, top: int) -> None:
+    calls = result["sheets_calls"]
+    print(f"\n=== {result['clubs']} clubs ===")
+    print(f"exported {result['exported']}/{result['clubs']} in {result['wall_s']:.1f} s "
+          f"→ {result['clubs_per_min']:.1f} clubs/min, peak {result['peak_mb']:.1f} MB, {result['retries']} retries")
+    print(f"club_profile calls: {sum(fetches.values())} "
+          + "(" + ", ".join(f"{n} × HTTP {status}" for status, n in sorted(fetches.items())) + ")")
+    print(f"Sheets calls: {calls.get('read', 0)} reads, {calls.get('write', 0)} writes, "
+          f"{result['sheets_rejected']} quota rejections; {result['sheets_requests']} batchUpdate requests, "
+          f"{result['sheets_bytes'] / 2**20:.2f} MB sent")
+    print(f"{'stage':<24} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}")
+    stages = sorted(result["stages"].items(), key=lambda kv: -kv[1]["total"])[:top]
+    for stage, s in stages:
+        print(f"{stage:<24} {s['n']:>6} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['total'] / 1000:>9.2f}")
+
+
+def main() -> int:
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        print(RESULT_MARK + json.dumps(child(json.loads(sys.argv[2]))), flush=True)
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clubs", type=int, nargs="+", default=[7, 100])
+    parser.add_argument("--members", type=int, default=30)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=200, help="club_profile answer time, ms (±50%%)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of club_profile calls answered with HTTP 500")
+    parser.add_argument("--sheets-latency", type=float, default=150, help="Sheets call time, ms")
+    parser.add_argument("--sheets-quota", type=int, default=60, help="Sheets reads and writes allowed per minute")
+    parser.add_argument("--top", type=int, default=12, help="stages listed per run")
+    parser.add_argument("--baseline", type=Path, help="fail if clubs/minute fell below this saved result")
+    parser.add_argument("--save-baseline", type=Path, help="write this run's clubs/minute as the baseline")
+    parser.add_argument("--max-regression", type=float, default=1.25, help="allowed slowdown vs the baseline")
+    parser.add_argument("main_args", nargs=argparse.REMAINDER, help="extra main.py flags, after --")
+    args = parser.parse_args()
+    main_args = args.main_args[1:] if args.main_args[:1] == ["--"] else args.main_args
+
+    server = serve_clubs(args.members, args.days, args.latency / 1000, args.fail_rate)
+    api_url = f"http://127.0.0.1:{server.server_address[1]}/api/club_profile"
+    results = {}
+    try:
+        for clubs in args.clubs:
+            server.stats.clear()
+            result = run_child({"clubs": clubs, "api_url": api_url, "main_args": main_args,
+                                "sheets_quota": args.sheets_quota, "sheets_latency": args.sheets_latency / 1000})
+            report(result, server.stats, args.top)
+            results[str(clubs)] = result
+    finally:
+        server.shutdown()
+
+    print(f"\n{'clubs':>6} {'exported':>9} {'wall s':>8} {'clubs/min':>10} {'peak MB':>8} {'Sheets calls':>13}")
+    for r in results.values():
+        n_calls = r["sheets_calls"].get("read", 0) + r["sheets_calls"].get("write", 0)
+        print(f"{r['clubs']:>6} {r['exported']:>9} {r['wall_s']:>8.1f} {r['clubs_per_min']:>10.1f} "
+              f"{r['peak_mb']:>8.1f} {n_calls:>13}")
+
+    failed = False
+    if args.baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text()).get("load", {})
+        for clubs, r in results.items():
+            if clubs in baseline and r["clubs_per_min"] * args.max_regression < baseline[clubs]:
+                print(f"❌ {clubs} clubs regressed: {r['clubs_per_min']:.1f} clubs/min vs baseline {baseline[clubs]:.1f}")
+                failed = True
+
+    if args.save_baseline:
+        saved = json.loads(args.save_baseline.read_text()) if args.save_baseline.exists() else {}
+        saved["load"] = {clubs: r["clubs_per_min"] for clubs, r in results.items()}
+        args.save_baseline.write_text(json.dumps(saved, indent=2))
+        print(f"Baseline saved to {args.save_baseline}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
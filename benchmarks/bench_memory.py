@@ -0,0 +1,66 @@
+"""Peak memory of holding many clubs for one batched export: per-club frames vs ClubStore.
+
+    python benchmarks/bench_memory.py --clubs 7 50 300 --members 30 --days 60
+
+"frames" keeps every club's built DataFrame until the batch is assembled (the
+old batched path); "store" keeps the history in one ClubStore and builds each
+frame only while its sheet rows are produced. Payloads are generated one at a
+time in both cases, as fetches arrive, and each club's sheet rows are dropped
+once checked, so the peak is what holding the clubs costs. Exits non-zero if
+the two paths give different sheet values.
+"""
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from club_store import ClubStore  # noqa: E402
+from frame_engine import build_dataframe_numpy  # noqa: E402
+from sheet_layout import build_sheet_values  # noqa: E402
+from benchmarks.synthetic import club_payload  # noqa: E402
+
+
+def run_frames(clubs: int, members: int, days: int) -> list[int]:
+    frames = [build_dataframe_numpy(club_payload(members, days, seed=c)) for c in range(clubs)]
+    return [hash(repr(build_sheet_values(df)[0])) for df in frames]
+
+
+def run_store(clubs: int, members: int, days: int) -> list[int]:
+    store = ClubStore()
+    for c in range(clubs):
+        store.put(f"club{c}", club_payload(members, days, seed=c))
+    return [hash(repr(build_sheet_values(store.frame(f"club{c}"))[0])) for c in range(clubs)]
+
+
+def peak_mb(fn, *args) -> tuple[float, list[int]]:
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clubs", type=int, nargs="+", default=[7, 50, 300])
+    parser.add_argument("--members", type=int, default=30)
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{args.members} members × {args.days} days per club; peak traced MB")
+    print(f"{'clubs':>6} {'frames':>9} {'store':>9} {'frames/club':>12} {'store/club':>11}")
+    for clubs in args.clubs:
+        frames_mb, frames_values = peak_mb(run_frames, clubs, args.members, args.days)
+        store_mb, store_values = peak_mb(run_store, clubs, args.members, args.days)
+        if frames_values != store_values:
+            print(f"❌ Sheet values differ for {clubs} clubs")
+            return 1
+        print(f"{clubs:>6} {frames_mb:>9.1f} {store_mb:>9.1f} {frames_mb / clubs:>12.3f} {store_mb / clubs:>11.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
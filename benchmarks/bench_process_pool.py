@@ -0,0 +1,63 @@
+"""Scale per-club frame and sheet-value building over worker processes.
+
+    python benchmarks/bench_process_pool.py --clubs 200 --members 30 --days 60
+    python benchmarks/bench_process_pool.py --workers 1 2 4 8
+
+Runs club_compute.prepare_club on every club inline, then in a warm
+ProcessPoolExecutor per worker count (pool start-up is reported separately).
+Exits non-zero if any worker result differs from the inline one.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from club_compute import prepare_club  # noqa: E402
+from benchmarks.synthetic import club_payloads  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clubs", type=int, default=200)
+    parser.add_argument("--members", type=int, default=30)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--engine", choices=["numpy", "pandas"], default="numpy")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    payloads = club_payloads(args.clubs, args.members, args.days)
+    engines = [args.engine] * len(payloads)
+
+    prepare_club(payloads[0], args.engine)  # warm, like the pool workers: the first call imports the engine
+    t0 = time.perf_counter()
+    inline = [prepare_club(p, args.engine) for p in payloads]
+    inline_s = time.perf_counter() - t0
+    expected = [repr(r) for r in inline]
+
+    print(f"{args.clubs} clubs × {args.members} members × {args.days} days, {os.cpu_count()} CPU(s)")
+    print(f"{'workers':>8} {'start s':>8} {'build s':>8} {'ms/club':>8} {'speedup':>8}")
+    print(f"{'inline':>8} {'':>8} {inline_s:>8.3f} {inline_s / args.clubs * 1000:>8.2f} {1:>7.1f}x")
+
+    ctx = multiprocessing.get_context("spawn")
+    for workers in args.workers:
+        t0 = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            list(pool.map(prepare_club, payloads[:workers], engines[:workers]))  # start and warm every worker
+            start_s = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            results = list(pool.map(prepare_club, payloads, engines, chunksize=max(1, args.clubs // (workers * 4))))
+            build_s = time.perf_counter() - t0
+        if [repr(r) for r in results] != expected:
+            print(f"❌ {workers} worker(s) produced different values than the inline build")
+            return 1
+        print(f"{workers:>8} {start_s:>8.2f} {build_s:>8.3f} {build_s / args.clubs * 1000:>8.2f} {inline_s / build_s:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
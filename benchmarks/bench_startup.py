@@ -0,0 +1,134 @@
+"""Measure start-up: time-to-menu, time-to-first-fetch and the import-time breakdown of main.py.
+
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --save-baseline benchmarks/baseline_startup.json
+    python benchmarks/bench_startup.py --baseline benchmarks/baseline_startup.json
+
+Every measurement is a fresh interpreter. time-to-menu ends when `import main`
+returns (pick_club() prints right after); time-to-first-fetch adds one direct
+club_profile fetch from a local stand-in server. Exits non-zero when either
+regressed more than --max-regression over the baseline.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from benchmarks.synthetic import club_payload  # noqa: E402
+
+CHILD = """
+import asyncio, json, sys, time
+t0 = float(sys.argv[1])
+import main
+menu = time.time() - t0
+
+async def first_fetch():
+    api = main.make_api_client("http", sys.argv[2])
+    try:
+        await main.fetch_club(next(iter(main.CLUBS.values()))["URL"], api=api)
+    finally:
+        await api.close()
+
+asyncio.run(first_fetch())
+print(json.dumps({"menu": menu, "first_fetch": time.time() - t0}))
+"""
+
+
+def serve_payload(payload: dict) -> ThreadingHTTPServer:
+    body = json.dumps(payload).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_child(api_url: str) -> dict:
+    t0 = time.time()
+    out = subprocess.run([sys.executable, "-c", CHILD, repr(t0), api_url],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_breakdown(top: int) -> list[tuple[str, float]]:
+    """Cumulative import time (ms) of main.py's direct imports, slowest first."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    children = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            if name.strip() == "main":
+                children.append(("main (total)", int(cumulative) / 1000))
+                break
+            children = []
+        elif depth == 1:
+            children.append((name.strip(), int(cumulative) / 1000))
+    return sorted(children, key=lambda kv: -kv[1])[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="rows of the import breakdown")
+    parser.add_argument("--baseline", type=Path, help="fail if slower than this saved result")
+    parser.add_argument("--save-baseline", type=Path, help="write this run's timings as the baseline")
+    parser.add_argument("--max-regression", type=float, default=1.25, help="allowed slowdown vs the baseline")
+    args = parser.parse_args()
+
+    server = serve_payload(club_payload(30, 30, seed=0))
+    api_url = f"http://127.0.0.1:{server.server_address[1]}/api/club_profile"
+    try:
+        runs = [run_child(api_url) for _ in range(args.repeat)]
+    finally:
+        server.shutdown()
+    timings = {key: statistics.median(r[key] for r in runs) for key in ("menu", "first_fetch")}
+
+    print(f"{'import (direct from main)':<32} {'cumulative ms':>13}")
+    for name, ms in import_breakdown(args.top):
+        print(f"{name:<32} {ms:>13.1f}")
+    print(f"\nmedian of {args.repeat} fresh interpreters")
+    print(f"{'time-to-menu':<32} {timings['menu'] * 1000:>10.1f} ms")
+    print(f"{'time-to-first-fetch':<32} {timings['first_fetch'] * 1000:>10.1f} ms")
+
+    failed = False
+    if args.baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text()).get("startup")
+        for key, secs in timings.items():
+            if baseline and secs > baseline[key] * args.max_regression:
+                print(f"❌ {key} regressed: {secs * 1000:.1f} ms vs baseline {baseline[key] * 1000:.1f} ms")
+                failed = True
+
+    if args.save_baseline:
+        saved = json.loads(args.save_baseline.read_text()) if args.save_baseline.exists() else {}
+        saved["startup"] = timings
+        args.save_baseline.write_text(json.dumps(saved, indent=2))
+        print(f"Baseline saved to {args.save_baseline}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import random
+
+
+# === Synthetic club_profile payloads ===
+def club_payload(members: int = 30, days: int = 30, seed: int = 0, start_day: int = 1,
+                 missing: float = 0.05, churn: float = 0.1) -> dict:
+    """A payload shaped like /api/club_profile with `members` x `days` fan-gain rows.
+
+    `missing` drops single (member, day) rows; a `churn` share of members joined
+    late or left early, so they lack the first or the newest days.
+    """
+    rnd = random.Random(seed)
+    history = []
+    last_day = start_day + days - 1
+    for m in range(members):
+        viewer_id = 100_000_000 + seed * 10_000 + m
+        name = f"Trainer{m:04d}"
+        first, last = start_day, last_day
+        if rnd.random() < churn:
+            if rnd.random() < 0.5:
+                first = rnd.randint(start_day, last_day)
+            else:
+                last = rnd.randint(start_day, last_day)
+        for day in range(first, last + 1):
+            if rnd.random() < missing:
+                continue
+            history.append({
+                "friend_viewer_id": viewer_id,
+                "friend_name": name,
+                "actual_date": day,
+                "adjusted_interpolated_fan_gain": rnd.randint(0, 6_000_000),
+            })
+    rnd.shuffle(history)
+    return {"club_friend_history": history}
+
+
+def club_payloads(clubs: int, members: int = 30, days: int = 30, seed: int = 0) -> list[dict]:
+    return [club_payload(members, days, seed=seed + c) for c in range(clubs)]
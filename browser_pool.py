@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from profiling import PROFILER
+
+if TYPE_CHECKING:
+    import zendriver as zd
+
+
+# === Resource blocking ===
+class TabTraffic:
+    """What one tab loaded and what was blocked before it reached the network."""
+
+    __slots__ = ("loaded_bytes", "requests", "blocked")
+
+    def __init__(self):
+        self.loaded_bytes = 0
+        self.requests = 0
+        self.blocked: dict[str, int] = {}  # resource type -> count
+
+    @property
+    def blocked_total(self) -> int:
+        return sum(self.blocked.values())
+
+
+async def watch_traffic(page: zd.Tab, block_types=(), block_urls=()) -> TabTraffic:
+    """Count the tab's traffic and fail matching requests before they are sent.
+
+    `block_types` are CDP resource types ("Image", "Font", ...); `block_urls`
+    are Fetch URL patterns ("*googletagmanager.com*"). Only matching requests
+    are paused, everything else goes straight through. Must run before the tab
+    navigates.
+    """
+    from zendriver import cdp
+
+    traffic = TabTraffic()
+
+    async def on_loaded(event: cdp.network.LoadingFinished):
+        traffic.requests += 1
+        traffic.loaded_bytes += int(event.encoded_data_length)
+
+    async def on_paused(event: cdp.fetch.RequestPaused):
+        kind = event.resource_type.value
+        traffic.blocked[kind] = traffic.blocked.get(kind, 0) + 1
+        try:
+            await page.send(cdp.fetch.fail_request(event.request_id, cdp.network.ErrorReason.BLOCKED_BY_CLIENT))
+        except Exception:
+            pass  # tab already closing
+
+    page.add_handler(cdp.network.LoadingFinished, on_loaded)
+    await page.send(cdp.network.enable())
+
+    stage = cdp.fetch.RequestStage.REQUEST
+    patterns = [cdp.fetch.RequestPattern(url_pattern="*", resource_type=cdp.network.ResourceType(t), request_stage=stage)
+                for t in block_types]
+    patterns += [cdp.fetch.RequestPattern(url_pattern=u, request_stage=stage) for u in block_urls]
+    if patterns:
+        page.add_handler(cdp.fetch.RequestPaused, on_paused)
+        await page.send(cdp.fetch.enable(patterns=patterns))
+    return traffic
+
+
+# === Browser pool ===
+class BrowserPool:
+    """A few long-lived browser instances that hand out tabs.
+
+    Browsers are launched lazily on first use and kept for the whole run, so the
+    start-up cost is paid once instead of once per club. A browser is only
+    relaunched when its health check fails (process exited or CDP disconnected).
+    Tabs block `block_types` / `block_urls` (see watch_traffic) from the start.
+    """
+
+    def __init__(self, size: int = 1, max_tabs: int = 4, browser: str = "edge",
+                 executable_path: str | None = None, block_types=(), block_urls=()):
+        self.size = max(1, int(size))
+        self.max_tabs = max(1, int(max_tabs))
+        self.browser = browser
+        self.executable_path = executable_path
+        self.block_types = tuple(block_types)
+        self.block_urls = tuple(block_urls)
+        self.launches = 0
+
+        self._browsers: list[zd.Browser | None] = [None] * self.size
+        self._open_tabs = [0] * self.size
+        self._locks = [asyncio.Lock() for _ in range(self.size)]
+        self._slots = asyncio.Semaphore(self.size * self.max_tabs)
+
+    async def __aenter__(self) -> BrowserPool:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    # --- Lifecycle ---
+    async def _launch(self) -> zd.Browser:
+        import zendriver as zd  # only runs that actually need a browser pay for this import
+
+        kwargs = {"browser": self.browser}
+        if self.executable_path:
+            kwargs["browser_executable_path"] = self.executable_path
+        with PROFILER.span("browser.launch"):
+            browser = await zd.start(**kwargs)
+            self.launches += 1
+        return browser
+
+    @staticmethod
+    async def _stop(browser: zd.Browser) -> None:
+        try:
+            await browser.stop()
+        except Exception:
+            pass
+
+    @staticmethod
+    async def is_healthy(browser: zd.Browser | None, timeout: float = 5) -> bool:
+        if browser is None or browser.stopped or browser.connection is None:
+            return False
+        from zendriver import cdp
+
+        try:
+            await asyncio.wait_for(browser.connection.send(cdp.browser.get_version()), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _get_browser(self, idx: int) -> zd.Browser:
+        async with self._locks[idx]:
+            browser = self._browsers[idx]
+            if browser is not None and not await self.is_healthy(browser):
+                print(f"♻️ Browser #{idx + 1} disconnected, relaunching...")
+                await self._stop(browser)
+                browser = None
+            if browser is None:
+                browser = await self._launch()
+                self._browsers[idx] = browser
+            return browser
+
+    async def close(self) -> None:
+        browsers = [b for b in self._browsers if b is not None]
+        self._browsers = [None] * self.size
+        for browser in browsers:
+            await self._stop(browser)
+
+    # --- Tabs ---
+    @asynccontextmanager
+    async def tab(self):
+        """Yield `(tab, traffic)` for a fresh blank tab on the least busy browser.
+
+        Resource blocking is already on when the tab is handed out; the tab is
+        closed on exit.
+        """
+        async with self._slots:
+            idx = min(range(self.size), key=lambda i: self._open_tabs[i])
+            self._open_tabs[idx] += 1
+            page = None
+            try:
+                browser = await self._get_browser(idx)
+                page = await browser.get("about:blank", new_tab=True)
+                traffic = await watch_traffic(page, self.block_types, self.block_urls)
+                yield page, traffic
+            finally:
+                self._open_tabs[idx] -= 1
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
@@ -0,0 +1,99 @@
+import asyncio
+import json
+from urllib.parse import parse_qs, urlparse
+
+from profiling import PROFILER
+
+
+# === Direct club_profile API client ===
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36 Edg/124.0",
+    "Accept": "application/json, text/plain, */*",
+}
+
+# Status codes the site answers with when it refuses non-browser traffic
+BLOCKED_STATUS = {401, 403, 429, 503}
+
+# The club_friend_history record fields the sheets are built from
+HISTORY_FIELDS = ("friend_viewer_id", "friend_name", "actual_date", "adjusted_interpolated_fan_gain")
+
+
+class ApiBlocked(Exception):
+    """The direct API call was refused (bot protection, rate limit, non-JSON body)."""
+
+
+def circle_id_from_url(url: str) -> str:
+    qs = parse_qs(urlparse(url).query)
+    ids = qs.get("circle_id")
+    if not ids or not ids[0]:
+        raise ValueError(f"No circle_id in club URL: {url}")
+    return ids[0]
+
+
+class ClubApiClient:
+    """Calls /api/club_profile directly over one pooled keep-alive HTTP client.
+
+    `fallback=True` lets the caller use the browser path when a call is blocked;
+    with `fallback=False` an ApiBlocked error is final. `api_url` can point at a
+    local stand-in server for testing.
+    """
+
+    MAX_RETRIES = 3
+    RETRY_DELAY = 2
+
+    def __init__(self, api_url: str, fallback: bool = True, timeout: float = 15, max_connections: int = 10):
+        import httpx  # loaded with the first client, not at start-up
+
+        self.api_url = api_url
+        self.fallback = fallback
+        self._client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self) -> "ClubApiClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def fetch(self, club_url: str) -> dict:
+        import httpx
+
+        params = {"circle_id": circle_id_from_url(club_url)}
+        headers = {"Referer": club_url}
+
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                with PROFILER.span("fetch.http", club=club_url, attempt=attempt + 1) as sp:
+                    resp = await self._client.get(self.api_url, params=params, headers=headers)
+                    sp["status"] = resp.status_code
+                    sp["bytes"] = len(resp.content)
+            except httpx.TransportError as e:
+                PROFILER.event("fetch.retry", club=club_url, attempt=attempt + 1, error=type(e).__name__)
+                if attempt < self.MAX_RETRIES - 1:
+                    await asyncio.sleep(self.RETRY_DELAY)
+                    continue
+                raise
+
+            if resp.status_code in BLOCKED_STATUS:
+                raise ApiBlocked(f"HTTP {resp.status_code}")
+            resp.raise_for_status()
+
+            # A challenge page comes back as 200 text/html
+            with PROFILER.span("fetch.json_decode", club=club_url):
+                try:
+                    data = json.loads(resp.content.decode("utf-8", errors="replace"))
+                except ValueError:
+                    raise ApiBlocked(f"non-JSON response ({resp.headers.get('content-type', '?')})")
+            if not isinstance(data, dict):
+                raise ApiBlocked("unexpected JSON payload")
+            return data
+
+        raise Exception(f"Direct fetch failed after {self.MAX_RETRIES} attempts.")
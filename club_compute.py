@@ -0,0 +1,47 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+# === CPU-bound club preparation in worker processes ===
+def prepare_club(data: dict, engine: str = "numpy") -> tuple[list[list], dict]:
+    """Payload → sheet values and layout (frame build + Total / Day AVG rows).
+
+    Pure and picklable, so it runs the same in a worker process as inline; the
+    result is identical either way.
+    """
+    from frame_engine import build_dataframe_numpy, build_dataframe_pandas
+    from sheet_layout import build_sheet_values
+
+    df = build_dataframe_numpy(data) if engine == "numpy" else build_dataframe_pandas(data)
+    return build_sheet_values(df)
+
+
+class ComputePool:
+    """Runs pure per-club work in a process pool, so clubs are built on all cores.
+
+    With 0 workers (the default) nothing is started and callers keep building
+    in the thread pool. The pool is started on first use and reused for the run.
+    """
+
+    def __init__(self):
+        self.workers = 0
+        self._pool: ProcessPoolExecutor | None = None
+
+    def configure(self, workers: int) -> None:
+        self.close()
+        self.workers = max(0, int(workers))
+
+    async def run(self, fn, *args):
+        if self._pool is None:
+            # spawn everywhere (Windows has nothing else; forking a process with live threads is unsafe)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+COMPUTE = ComputePool()
@@ -0,0 +1,177 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from frame_engine import frame_from_matrix
+
+
+# === Compact in-memory history of many clubs ===
+def _code(codes: dict, values: list, value) -> int:
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(values)
+        values.append(value)
+    return code
+
+
+class ClubStore:
+    """Every club's club_friend_history in four shared columnar arrays.
+
+    One row per history record: int64 viewer id, int32 name code (names are
+    interned once across all clubs), int32 date code and float64 gain. A club
+    is a contiguous row range, so building its frame reads views of the shared
+    arrays instead of a per-club payload, json_normalize frame and pivot.
+
+    `put` only accepts payloads the arrays represent exactly (int ids and dates,
+    str names, numeric gains); for anything else it returns False and the
+    caller builds from the payload as before. `frame(club)` equals
+    build_dataframe_pandas on the same payload.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.viewer_ids = np.empty(capacity, np.int64)
+        self.name_codes = np.empty(capacity, np.int32)
+        self.date_codes = np.empty(capacity, np.int32)
+        self.gains = np.empty(capacity, np.float64)
+        self.size = 0
+        self.dead = 0  # rows of replaced clubs, reclaimed by _compact
+
+        self.names: list[str] = []
+        self._name_codes: dict[str, int] = {}
+        self.dates: list[int] = []
+        self._date_codes: dict[int, int] = {}
+
+        self._clubs: dict[str, tuple[int, int, bool]] = {}  # club -> (start, stop, all gains int)
+        self._lock = threading.Lock()
+
+    def __contains__(self, club: str) -> bool:
+        return club in self._clubs
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.viewer_ids, self.name_codes, self.date_codes, self.gains)
+        return sum(a.nbytes for a in arrays)
+
+    # --- Writing ---
+    def _intern(self, history: list[dict]):
+        ids, names, dates, gains = [], [], [], []
+        int_gains = True
+        for rec in history:
+            viewer_id, name, date = rec.get("friend_viewer_id"), rec.get("friend_name"), rec.get("actual_date")
+            gain = rec.get("adjusted_interpolated_fan_gain")
+            if type(viewer_id) is not int or type(date) is not int or not isinstance(name, str):
+                return None
+            if type(gain) is int:
+                pass
+            elif type(gain) is float or gain is None:
+                int_gains = False
+            else:
+                return None
+            ids.append(viewer_id)
+            names.append(name)
+            dates.append(date)
+            gains.append(np.nan if gain is None else gain)
+        return ids, names, dates, gains, int_gains
+
+    def _reserve(self, rows: int) -> None:
+        if self.size + rows <= len(self.gains):
+            return
+        if self.dead * 2 >= self.size:
+            self._compact()
+            if self.size + rows <= len(self.gains):
+                return
+        capacity = max(2 * len(self.gains), self.size + rows)
+        for attr in ("viewer_ids", "name_codes", "date_codes", "gains"):
+            old = getattr(self, attr)
+            new = np.empty(capacity, old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, attr, new)
+
+    def _compact(self) -> None:
+        keep = np.concatenate([np.arange(s, e) for s, e, _ in self._clubs.values()] or [np.arange(0)])
+        pos = 0
+        for club, (s, e, int_gains) in list(self._clubs.items()):
+            self._clubs[club] = (pos, pos + e - s, int_gains)
+            pos += e - s
+        # Fresh arrays, not in place: frames being built may still hold views of the old ones
+        for attr in ("viewer_ids", "name_codes", "date_codes", "gains"):
+            old = getattr(self, attr)
+            new = np.empty(len(old), old.dtype)
+            new[:pos] = old[keep]
+            setattr(self, attr, new)
+        self.size, self.dead = pos, 0
+
+    def put(self, club: str, data: dict) -> bool:
+        """Store (or replace) one club's history; False if the payload needs the reference builder."""
+        history = data.get("club_friend_history") or []
+        parsed = self._intern(history) if history else None
+        if parsed is None:
+            return False
+        ids, names, dates, gains, int_gains = parsed
+        if all(g != g for g in gains):
+            return False
+
+        with self._lock:
+            name_codes = [_code(self._name_codes, self.names, n) for n in names]
+            date_codes = [_code(self._date_codes, self.dates, d) for d in dates]
+
+            old = self._clubs.pop(club, None)
+            if old is not None:
+                self.dead += old[1] - old[0]
+            n = len(ids)
+            self._reserve(n)
+            s, e = self.size, self.size + n
+            self.viewer_ids[s:e] = ids
+            self.name_codes[s:e] = name_codes
+            self.date_codes[s:e] = date_codes
+            self.gains[s:e] = gains
+            self.size = e
+            self._clubs[club] = (s, e, int_gains)
+        return True
+
+    def discard(self, club: str) -> None:
+        with self._lock:
+            old = self._clubs.pop(club, None)
+            if old is not None:
+                self.dead += old[1] - old[0]
+
+    # --- Reading ---
+    def frame(self, club: str) -> pd.DataFrame:
+        with self._lock:
+            s, e, int_gains = self._clubs[club]
+            ids, names, dates, gains = (self.viewer_ids[s:e], self.name_codes[s:e],
+                                        self.date_codes[s:e], self.gains[s:e])
+            all_names, all_dates = self.names, np.asarray(self.dates, dtype=np.int64)
+
+        # Members sorted by (id, name), days by date, like the pivot
+        id_uniques, id_codes = np.unique(ids, return_inverse=True)
+        name_uniques, name_local = np.unique(names, return_inverse=True)
+        by_text = sorted(range(len(name_uniques)), key=lambda i: all_names[name_uniques[i]])
+        name_rank = np.empty(len(name_uniques), np.int64)
+        name_rank[by_text] = np.arange(len(name_uniques))
+        pair = id_codes.astype(np.int64) * len(name_uniques) + name_rank[name_local]
+        member_pairs, member_codes = np.unique(pair, return_inverse=True)
+
+        day_values, col_codes = np.unique(all_dates[dates], return_inverse=True)
+
+        # First non-NaN gain per (member, day) wins
+        ok = ~np.isnan(gains)
+        flat = member_codes[ok].astype(np.int64) * len(day_values) + col_codes[ok]
+        cells, first = np.unique(flat, return_index=True)
+        mat = np.full((len(member_pairs), len(day_values)), np.nan)
+        mat.flat[cells] = gains[ok][first]
+
+        keep_rows = ~np.isnan(mat).all(axis=1)
+        keep_cols = ~np.isnan(mat).all(axis=0)
+        mat, member_pairs, day_values = mat[keep_rows][:, keep_cols], member_pairs[keep_rows], day_values[keep_cols]
+        int_cells = int_gains and not np.isnan(mat).any()
+
+        # Keep only members who have value on the newest day
+        latest_ok = ~np.isnan(mat[:, -1])
+        mat, member_pairs = mat[latest_ok], member_pairs[latest_ok]
+
+        text_names = np.asarray([all_names[c] for c in name_uniques[by_text]], dtype=object)
+        member_ids = np.asarray([str(i) for i in id_uniques], dtype=object)[member_pairs // len(name_uniques)]
+        member_names = text_names[member_pairs % len(name_uniques)]
+        return frame_from_matrix(mat, member_ids, member_names, [f"Day {d}" for d in day_values], int_cells)
@@ -0,0 +1,223 @@
+import numbers
+import threading
+
+import numpy as np
+import pandas as pd
+
+import sheet_diff
+from batch_export import ClubFrame, update_cells_request
+from profiling import PROFILER
+from sheets_scheduler import SHEETS
+
+
+# === Cross-club summary sheet ===
+CLUB_HEADER = ["Club", "Members", "Threshold", "Total fans", "Avg / member / day", "Below threshold",
+               "Latest day", "Previous day", "Day change", "Day change %"]
+MEMBER_HEADER = ["#", "Member", "Club", "AVG/d", "Club threshold", "Total"]
+
+
+def _floats(cells: list) -> np.ndarray:
+    return np.array([np.nan if v == "" or v is None else v for v in cells], dtype=float)
+
+
+def club_columns(frame: ClubFrame) -> tuple[np.ndarray, ...]:
+    """(names, AVG/d, total, latest day, previous day) per member, from a built frame or its sheet values."""
+    if callable(frame):
+        frame = frame()
+    if isinstance(frame, pd.DataFrame):
+        dcols = [c for c in frame.columns if isinstance(c, str) and c.startswith("Day ")]
+        names = frame["Member_Name"].to_numpy(dtype=object)
+        avg = frame["AVG/d"].to_numpy(dtype=float)
+        days = frame[dcols].to_numpy(dtype=float)
+    else:
+        values, layout = frame
+        header, rows = layout["header"], values[1:1 + layout["n_data_rows"]]
+        names = np.array([r[header.index("Member_Name")] for r in rows], dtype=object)
+        avg = _floats([r[header.index("AVG/d")] for r in rows])
+        idx = [header.index(c) for c in layout["dcols"]]
+        days = np.array([_floats([r[i] for i in idx]) for r in rows]).reshape(len(rows), len(idx))
+
+    n = len(names)
+    latest = days[:, -1] if days.shape[1] else np.full(n, np.nan)
+    previous = days[:, -2] if days.shape[1] > 1 else np.full(n, np.nan)
+    total = np.nansum(days, axis=1)
+    return names, avg, total, latest, previous
+
+
+def _cell(v):
+    # Sheets cells: NaN is a blank, numpy scalars become Python numbers
+    if isinstance(v, numbers.Number) and not isinstance(v, bool):
+        return "" if v != v else (int(v) if isinstance(v, (int, np.integer)) else float(v))
+    return v
+
+
+class ClubSummary:
+    """Every club's member columns, collected as its frame is built, for the summary sheet.
+
+    `add` keeps only five small arrays per club (not the frame), so it can be fed
+    from the export paths as frames go by; `build` then computes the whole
+    dashboard in one vectorized pass over all clubs.
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self._clubs: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, title: str) -> bool:
+        return title in self._clubs
+
+    def __len__(self) -> int:
+        return len(self._clubs)
+
+    def add(self, title: str, frame: ClubFrame, threshold: int) -> None:
+        columns = club_columns(frame)
+        with self._lock:
+            self._clubs[title] = (threshold, *columns)
+
+    def build(self, titles: list[str]) -> tuple[list[list], dict]:
+        """Summary values for the clubs in `titles` (in that order) plus the layout its formatting needs."""
+        with self._lock:
+            clubs = [(t, self._clubs[t]) for t in titles if t in self._clubs]
+        k = len(clubs)
+        sizes = np.array([len(c[1]) for _, c in clubs], dtype=np.int64)
+        code = np.repeat(np.arange(k), sizes)
+        thresholds = np.array([c[0] for _, c in clubs], dtype=float)
+        names, avg, total, latest, previous = (
+            np.concatenate([c[i] for _, c in clubs]) if k else np.empty(0) for i in range(1, 6))
+        avg, total, latest, previous = (a.astype(float) for a in (avg, total, latest, previous))
+
+        # Per club, all at once
+        has_avg = ~np.isnan(avg)
+        fans = np.bincount(code, weights=total, minlength=k)
+        avg_sum = np.bincount(code, weights=np.where(has_avg, avg, 0), minlength=k)
+        avg_n = np.bincount(code, weights=has_avg, minlength=k)
+        below = np.bincount(code, weights=has_avg & (avg < thresholds[code]), minlength=k).astype(np.int64)
+        day = np.bincount(code, weights=np.nan_to_num(latest), minlength=k)
+        prev = np.bincount(code, weights=np.nan_to_num(previous), minlength=k)
+        has_prev = np.bincount(code, weights=~np.isnan(previous), minlength=k) > 0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_member = np.where(avg_n > 0, avg_sum / avg_n, np.nan)
+            change = np.where(has_prev, day - prev, np.nan)
+            change_pct = np.where(has_prev & (prev > 0), change / prev, np.nan)
+            all_prev = prev[has_prev].sum()
+            all_change = (day[has_prev] - prev[has_prev]).sum() if has_prev.any() else np.nan
+            all_pct = all_change / all_prev if all_prev > 0 else np.nan
+
+        rows = [CLUB_HEADER]
+        for i, (title, _) in enumerate(clubs):
+            rows.append([title, sizes[i], thresholds[i], fans[i], np.round(per_member[i]), below[i],
+                         day[i], prev[i] if has_prev[i] else np.nan, change[i], change_pct[i]])
+        all_avg = avg_sum.sum() / avg_n.sum() if avg_n.sum() else np.nan
+        rows.append(["All clubs", sizes.sum(), "", fans.sum(), np.round(all_avg), below.sum(),
+                     day.sum(), all_prev if has_prev.any() else np.nan, all_change, all_pct])
+
+        # Top / bottom members across every club, by AVG/d (ties: CLUBS order, then rank in club)
+        ranked = np.flatnonzero(has_avg)[np.argsort(-avg[has_avg], kind="stable")]
+        n = min(self.top_n, len(ranked))
+        titles_arr = np.array([t for t, _ in clubs], dtype=object)
+
+        def member_rows(idx: np.ndarray) -> list[list]:
+            return [[r + 1, names[i], titles_arr[code[i]], avg[i], thresholds[code[i]], total[i]]
+                    for r, i in enumerate(idx)]
+
+        top_row = len(rows) + 1
+        rows += [[], [f"Top {n} members (AVG/d, all clubs)"], MEMBER_HEADER] + member_rows(ranked[:n])
+        bottom_row = len(rows) + 1
+        rows += [[], [f"Bottom {n} members (AVG/d, all clubs)"], MEMBER_HEADER] + member_rows(ranked[::-1][:n])
+
+        values = [[_cell(v) for v in row] for row in rows]
+        layout = {"n_clubs": k, "top_row": top_row, "bottom_row": bottom_row, "n_members": n}
+        return values, layout
+
+
+def summary_format_requests(sheet_id: int, layout: dict) -> list[dict]:
+    """Styling for the summary sheet: blue headers and totals, number formats, red flags, borders."""
+    k, n = layout["n_clubs"], layout["n_members"]
+    blue_fill = {"red": 0.31, "green": 0.51, "blue": 0.74}
+    white_bold = {"bold": True, "foregroundColor": {"red": 1, "green": 1, "blue": 1}}
+    red_fill = {"red": 1.00, "green": 0.78, "blue": 0.81}
+    solid = {"style": "SOLID"}
+
+    def rng(r0, r1, c0, c1):
+        return {"sheetId": sheet_id, "startRowIndex": r0, "endRowIndex": r1, "startColumnIndex": c0, "endColumnIndex": c1}
+
+    def fmt(r, fields, **cell):
+        return {"repeatCell": {"range": r, "cell": {"userEnteredFormat": cell}, "fields": f"userEnteredFormat({fields})"}}
+
+    def borders(r):
+        return {"updateBorders": {"range": r, "top": solid, "bottom": solid, "left": solid, "right": solid,
+                                  "innerHorizontal": solid, "innerVertical": solid}}
+
+    def rule(r, condition):
+        return {"addConditionalFormatRule": {"rule": {"ranges": [r], "booleanRule": {
+            "condition": condition, "format": {"backgroundColor": red_fill}}}, "index": 0}}
+
+    club_cols, member_cols = len(CLUB_HEADER), len(MEMBER_HEADER)
+    header_fmt = dict(backgroundColor=blue_fill, textFormat=white_bold, horizontalAlignment="CENTER")
+    requests = [
+        fmt(rng(0, 1, 0, club_cols), "backgroundColor,textFormat,horizontalAlignment", **header_fmt),
+        fmt(rng(k + 1, k + 2, 0, club_cols), "backgroundColor,textFormat", backgroundColor=blue_fill, textFormat=white_bold),
+        fmt(rng(1, k + 2, 1, club_cols - 1), "numberFormat", numberFormat={"type": "NUMBER", "pattern": "#,##0"}),
+        fmt(rng(1, k + 2, club_cols - 1, club_cols), "numberFormat", numberFormat={"type": "PERCENT", "pattern": "0.0%"}),
+        borders(rng(0, k + 2, 0, club_cols)),
+        rule(rng(1, k + 1, 5, 6), {"type": "NUMBER_GREATER", "values": [{"userEnteredValue": "0"}]}),
+        rule(rng(1, k + 1, 8, 9), {"type": "NUMBER_LESS", "values": [{"userEnteredValue": "0"}]}),
+    ]
+    for start in (layout["top_row"], layout["bottom_row"]):
+        title_row, header_row = start, start + 1
+        first, end = header_row + 1, header_row + 1 + n
+        requests += [
+            fmt(rng(title_row, title_row + 1, 0, 1), "textFormat", textFormat={"bold": True}),
+            fmt(rng(header_row, header_row + 1, 0, member_cols), "backgroundColor,textFormat,horizontalAlignment",
+                **header_fmt),
+            fmt(rng(first, end, 3, member_cols), "numberFormat", numberFormat={"type": "NUMBER", "pattern": "#,##0"}),
+            borders(rng(header_row, end, 0, member_cols)),
+        ]
+        if n:
+            # Member below their own club's threshold
+            requests.append(rule(rng(first, end, 3, 4),
+                                 {"type": "CUSTOM_FORMULA", "values": [{"userEnteredValue": f"=$D{first + 1}<$E{first + 1}"}]}))
+    requests += [
+        {"updateDimensionProperties": {"range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": 0, "endIndex": 1},
+                                       "properties": {"pixelSize": 140}, "fields": "pixelSize"}},
+        {"updateDimensionProperties": {"range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": 1, "endIndex": club_cols},
+                                       "properties": {"pixelSize": 120}, "fields": "pixelSize"}},
+        {"updateSheetProperties": {"properties": {"sheetId": sheet_id, "gridProperties": {"frozenRowCount": 1}},
+                                   "fields": "gridProperties.frozenRowCount"}},
+    ]
+    return requests
+
+
+def write_summary(gc, spreadsheet_id: str, title: str, values: list[list], layout: dict) -> None:
+    """Replace the summary sheet's contents in one batchUpdate (values and formatting together).
+
+    The sheet is kept (its link stays valid): it is cleared, its old conditional
+    rules removed, and refilled. A new summary sheet goes in front of the club sheets.
+    """
+    from sheet_templates import new_sheet_id
+
+    ss = SHEETS.call("read", gc.open_by_key, spreadsheet_id)
+    meta = SHEETS.call("read", ss.fetch_sheet_metadata, params={
+        "fields": "sheets(properties(sheetId,title,index,gridProperties),conditionalFormats(booleanRule(condition(type))))"})
+    sheets = {s["properties"]["title"]: s for s in meta.get("sheets", [])}
+    n_rows, n_cols = len(values) + 10, len(CLUB_HEADER) + 2
+
+    state = sheets.get(title)
+    if state is None:
+        sheet_id = new_sheet_id({s["properties"]["sheetId"] for s in sheets.values()})
+        requests = [{"addSheet": {"properties": {"sheetId": sheet_id, "title": title, "index": 0,
+                                                 "gridProperties": {"rowCount": n_rows, "columnCount": n_cols}}}}]
+    else:
+        sheet_id = state["properties"]["sheetId"]
+        requests = [{"deleteConditionalFormatRule": {"sheetId": sheet_id, "index": i}}
+                    for i in reversed(range(len(state.get("conditionalFormats", []))))]
+        grow = sheet_diff.grow_grid_request(state, n_rows, n_cols)
+        requests += [grow] if grow is not None else []
+        requests.append({"updateCells": {"range": {"sheetId": sheet_id}, "fields": "userEnteredValue,userEnteredFormat"}})
+
+    requests.append(update_cells_request(sheet_id, 0, 0, values))
+    requests += summary_format_requests(sheet_id, layout)
+    with PROFILER.span("sheets.summary", requests=len(requests)):
+        SHEETS.call("write", ss.batch_update, {"requests": requests})
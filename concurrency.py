@@ -0,0 +1,169 @@
+import asyncio
+import contextlib
+import ctypes
+import os
+import sys
+import time
+
+from profiling import PROFILER
+
+
+# === Per-stage concurrency limits ===
+MEMORY_HIGH = 90     # % of RAM in use (psutil, or Windows' memory load) above which adaptive limits back off
+CPU_HIGH = 95        # % CPU busy (psutil)
+LOAD_HIGH = 1.5      # 1-minute load average per core, without psutil (POSIX only)
+SLOW_FACTOR = 2.0    # window median this many times the fastest seen: back off
+FAST_FACTOR = 1.5    # ... at most this many times: room to grow
+ERROR_RATE = 0.25    # failed share of a window that backs off
+
+
+def _psutil():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil
+
+
+class _MemoryStatus(ctypes.Structure):
+    _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong)] + \
+               [(name, ctypes.c_ulonglong) for name in ("ullTotalPhys", "ullAvailPhys", "ullTotalPageFile",
+                                                        "ullAvailPageFile", "ullTotalVirtual", "ullAvailVirtual",
+                                                        "ullAvailExtendedVirtual")]
+
+
+def _windows_memory_load() -> int | None:
+    # % of physical memory in use, from GlobalMemoryStatusEx (Windows without psutil)
+    status = _MemoryStatus(dwLength=ctypes.sizeof(_MemoryStatus))
+    if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+        return None
+    return status.dwMemoryLoad
+
+
+def resource_signal() -> str | None:
+    """What system_pressure watches on this machine, or None when it has nothing to go on."""
+    if _psutil() is not None:
+        return "memory / CPU (psutil)"
+    if sys.platform == "win32":
+        return "memory load"
+    if hasattr(os, "getloadavg"):
+        return "load average"
+    return None
+
+
+def system_pressure() -> str | None:
+    """Why the machine is overloaded ("memory 93%", ...), or None."""
+    psutil = _psutil()
+    if psutil is not None:
+        mem = psutil.virtual_memory().percent
+        if mem >= MEMORY_HIGH:
+            return f"memory {mem:.0f}%"
+        cpu = psutil.cpu_percent(None)  # since the previous check
+        if cpu >= CPU_HIGH:
+            return f"cpu {cpu:.0f}%"
+    elif sys.platform == "win32":
+        mem = _windows_memory_load()
+        if mem is not None and mem >= MEMORY_HIGH:
+            return f"memory {mem}%"
+    elif hasattr(os, "getloadavg"):
+        load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        if load >= LOAD_HIGH:
+            return f"load {load:.1f}/core"
+    return None
+
+
+class StageLimiter:
+    """At most `limit` clubs in one stage at a time.
+
+    Adaptive limiters start at half the limit and move between 1 and `limit`
+    (additive increase, multiplicative decrease): after each window of
+    finished slots the limit is halved when too many failed, the median time
+    grew well past the fastest window seen, or the machine is short of memory
+    / CPU; it goes up by one when everything was fast, ok and clubs were
+    waiting.
+    """
+
+    def __init__(self, name: str, limit: int, adaptive: bool = False):
+        self.name = name
+        self.max_limit = max(1, limit)
+        self.adaptive = adaptive
+        self.limit = (self.max_limit + 1) // 2 if adaptive else self.max_limit
+        self.active = 0
+        self.waiting = 0
+        self._cond = asyncio.Condition()
+        self._window: list[tuple[float, bool]] = []
+        self._best: float | None = None
+        self._changes = 0
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        async with self._cond:
+            if self.active >= self.limit:
+                self.waiting += 1
+                try:
+                    await self._cond.wait_for(lambda: self.active < self.limit)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+        changes = self._changes
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed = time.perf_counter() - t0
+            async with self._cond:
+                self.active -= 1
+                # Slots started before the last change ran at the old limit: not a sample of this one
+                if self.adaptive and changes == self._changes:
+                    self._observe(elapsed, ok)
+                self._cond.notify_all()
+
+    def _observe(self, elapsed: float, ok: bool) -> None:
+        self._window.append((elapsed, ok))
+        if len(self._window) < max(4, 2 * self.limit):
+            return
+        times = sorted(t for t, _ in self._window)
+        median = times[len(times) // 2]
+        errors = sum(not ok for _, ok in self._window) / len(self._window)
+        # At a limit of 1 the median is the unloaded time, whatever was seen before
+        best = self._best = median if self._best is None or self.limit == 1 else min(self._best, median)
+
+        reason = system_pressure()
+        if reason is None and errors > ERROR_RATE:
+            reason = f"{errors:.0%} failed"
+        if reason is None and median > SLOW_FACTOR * best:
+            reason = f"median {median * 1000:.0f} ms vs {best * 1000:.0f} ms"
+        if reason is not None:
+            self._set(max(1, self.limit // 2), reason)
+        elif self.waiting and errors == 0 and median <= FAST_FACTOR * best:
+            self._set(min(self.max_limit, self.limit + 1), f"median {median * 1000:.0f} ms, clubs waiting")
+        self._window = []
+
+    def _set(self, limit: int, reason: str) -> None:
+        if limit == self.limit:
+            return
+        if limit < self.limit:
+            print(f"🎚️ {self.name} concurrency {self.limit} → {limit} ({reason})")
+        PROFILER.event("concurrency.adjust", limiter=self.name, limit=limit, previous=self.limit, reason=reason)
+        self.limit = limit
+        self._changes += 1
+
+
+class StageLimits:
+    """The run's limiters by stage name ("fetch", "export"); a stage without one is unlimited."""
+
+    def __init__(self):
+        self.stages: dict[str, StageLimiter] = {}
+
+    def configure(self, limits: dict[str, int], adaptive: bool = False) -> None:
+        # 0 / None: no limit for that stage
+        self.stages = {name: StageLimiter(name, n, adaptive) for name, n in limits.items() if n}
+
+    def slot(self, stage: str):
+        limiter = self.stages.get(stage)
+        return limiter.slot() if limiter is not None else contextlib.nullcontext()
+
+
+LIMITS = StageLimits()
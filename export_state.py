@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from club_api import HISTORY_FIELDS
+
+
+# === Change detection between exports ===
+def history_digest(data: dict, *salt) -> str:
+    """SHA-256 of a payload's club_friend_history, independent of record order and extra keys.
+
+    `salt` (threshold, spreadsheet id, ...) is hashed in too, so changing what a
+    sheet is built with also counts as a change.
+    """
+    h = hashlib.sha256(json.dumps(salt, default=str).encode("utf-8"))
+    rows = sorted(
+        json.dumps([rec.get(f) for f in HISTORY_FIELDS], ensure_ascii=False, default=str)
+        for rec in data.get("club_friend_history") or []
+    )
+    for row in rows:
+        h.update(b"\n")
+        h.update(row.encode("utf-8"))
+    return h.hexdigest()
+
+
+class ExportState:
+    """Last exported history digest per club sheet, kept in a small JSON file.
+
+    Layout: ``{title: {"hash", "exported_at", "checked_at"}}``. A club whose
+    digest matches its last export needs neither a rebuild nor any Sheets call.
+    With `force`, nothing counts as unchanged but exports are still recorded.
+    """
+
+    def __init__(self, path: Path, force: bool = False):
+        self.path = Path(path)
+        self.force = force
+        self._state: dict[str, dict] = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def unchanged(self, title: str, digest: str) -> bool:
+        return not self.force and self._state.get(title, {}).get("hash") == digest
+
+    def mark_checked(self, title: str) -> None:
+        self._state.setdefault(title, {})["checked_at"] = time.time()
+        self._save()
+
+    def mark_exported(self, title: str, digest: str) -> None:
+        now = time.time()
+        self._state[title] = {"hash": digest, "exported_at": now, "checked_at": now}
+        self._save()
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from club_api import HISTORY_FIELDS as FIELDS
+
+
+# === DataFrame engines ===
+# build_dataframe_pandas is the reference (json_normalize + pivot_table).
+# build_dataframe_numpy gives the same output (values, dtypes, row/column order)
+# without them: members and days are factorized once and the gains are scattered
+# straight into a member x day matrix.
+
+
+def day_num(x: str):
+    if not isinstance(x, str) or not x.startswith("Day "):
+        return None
+    try:
+        return int(x.split(maxsplit=1)[1])
+    except Exception:
+        return None
+
+
+def build_dataframe_pandas(data: dict) -> pd.DataFrame:
+    df = pd.json_normalize(data.get("club_friend_history") or [])
+    for c in ("friend_viewer_id", "friend_name", "actual_date", "adjusted_interpolated_fan_gain"):
+        if c not in df.columns:
+            df[c] = pd.NA
+
+    df = (
+        df.assign(day_col=lambda d: "Day " + d["actual_date"].astype(str))
+            .pivot_table(
+                index=["friend_viewer_id", "friend_name"],
+                columns="day_col",
+                values="adjusted_interpolated_fan_gain",
+                aggfunc="first"
+            )
+            .reset_index()
+    )
+    df.columns.name = None
+
+    def _day_num(x: str):
+        if not isinstance(x, str) or not x.startswith("Day "):
+            return None
+        try:
+            return int(x.split(maxsplit=1)[1])
+        except Exception:
+            return None
+
+    day_cols = [c for c in df.columns if isinstance(c, str) and c.startswith("Day ")]
+
+    # --- Keep only members who have value on the newest day (max Day N) ---
+    nums = [n for n in map(_day_num, day_cols) if n is not None]
+    if nums:
+        latest_day = max(nums)
+        latest_col = f"Day {latest_day}"
+        if latest_col in df.columns:
+            df = df[~df[latest_col].isna()].copy()
+
+    # Order Day columns numerically
+    day_cols = sorted(day_cols, key=lambda c: (_day_num(c) if _day_num(c) is not None else float("inf")))
+
+    # Compute AVG/d and finalize columns
+    df["AVG/d"] = df[day_cols].mean(axis=1).round(0) if day_cols else 0
+    df = df[["friend_viewer_id", "friend_name", "AVG/d"] + day_cols].rename(
+        columns={"friend_viewer_id": "Member_ID", "friend_name": "Member_Name"}
+    )
+    df["Member_ID"] = df["Member_ID"].fillna("").astype(str)
+    df["Member_Name"] = df["Member_Name"].fillna("").astype(str)
+    for c in df.columns:
+        if c not in ("Member_ID", "Member_Name"):
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+
+    df = df.sort_values(["AVG/d", "Member_Name"], ascending=[False, True], kind="mergesort").reset_index(drop=True)
+    return df
+
+
+def build_dataframe_numpy(data: dict) -> pd.DataFrame:
+    # Degenerate payloads (empty, missing fields, non-numeric gains) go through the reference
+    history = data.get("club_friend_history") or []
+    if not history:
+        return build_dataframe_pandas(data)
+
+    # Only the four fields we need (json_normalize would flatten every key)
+    records = pd.DataFrame.from_records(history, columns=list(FIELDS))
+    ids, names, dates, gains = (records[f] for f in FIELDS)
+    if any(s.isna().all() for s in (ids, names, dates)) or not pd.api.types.is_numeric_dtype(gains):
+        return build_dataframe_pandas(data)
+
+    # --- Factorize: members sorted by (id, name) and day labels sorted as strings, like pivot_table ---
+    id_codes, id_uniques = pd.factorize(ids, sort=True)
+    name_codes, name_uniques = pd.factorize(names, sort=True)
+    has_member = (id_codes >= 0) & (name_codes >= 0)
+    pair = np.where(has_member, id_codes.astype(np.int64) * len(name_uniques) + name_codes, -1)
+    member_codes, member_pairs = pd.factorize(pair[has_member], sort=True)
+
+    date_codes, date_uniques = pd.factorize(dates, sort=False, use_na_sentinel=False)
+    labels = "Day " + pd.Series(date_uniques).astype(str)
+    label_codes, label_uniques = pd.factorize(labels, sort=True)
+    col_codes = label_codes[date_codes[has_member]]
+
+    # --- Scatter: first non-NaN gain per (member, day) wins ---
+    values = gains.to_numpy(dtype=np.float64)[has_member]
+    ok = ~np.isnan(values)
+    flat = member_codes[ok].astype(np.int64) * len(label_uniques) + col_codes[ok]
+    cells, first = np.unique(flat, return_index=True)
+    mat = np.full((len(member_pairs), len(label_uniques)), np.nan)
+    mat.flat[cells] = values[ok][first]
+
+    # pivot_table drops all-NaN rows and columns
+    keep_rows = ~np.isnan(mat).all(axis=1)
+    keep_cols = ~np.isnan(mat).all(axis=0)
+    if not keep_rows.any():
+        return build_dataframe_pandas(data)
+    mat = mat[keep_rows][:, keep_cols]
+    member_pairs = np.asarray(member_pairs)[keep_rows]
+    col_labels = [str(c) for c in np.asarray(label_uniques)[keep_cols]]
+
+    # Integer gains stay integer unless the matrix has gaps (pivot_table's downcast)
+    int_cells = pd.api.types.is_integer_dtype(gains) and not np.isnan(mat).any()
+
+    # --- Keep only members who have value on the newest day (max Day N) ---
+    nums = [n for n in map(day_num, col_labels) if n is not None]
+    if nums:
+        latest_col = f"Day {max(nums)}"
+        if latest_col in col_labels:
+            latest_ok = ~np.isnan(mat[:, col_labels.index(latest_col)])
+            mat, member_pairs = mat[latest_ok], member_pairs[latest_ok]
+
+    # Order Day columns numerically (stable over the string order)
+    nums_by_col = [day_num(c) for c in col_labels]
+    order = sorted(range(len(col_labels)), key=lambda i: nums_by_col[i] if nums_by_col[i] is not None else float("inf"))
+    day_cols = [col_labels[i] for i in order]
+    mat = mat[:, order]
+
+    member_ids = np.asarray(pd.Index(id_uniques).astype(str), dtype=object)[member_pairs // len(name_uniques)]
+    member_names = np.asarray(pd.Index(name_uniques).astype(str), dtype=object)[member_pairs % len(name_uniques)]
+    return frame_from_matrix(mat, member_ids, member_names, day_cols, int_cells)
+
+
+def frame_from_matrix(mat: np.ndarray, member_ids: np.ndarray, member_names: np.ndarray,
+                      day_cols: list[str], int_cells: bool) -> pd.DataFrame:
+    """Final frame from a filtered member x day matrix whose columns are already in day order."""
+    days = pd.DataFrame(mat.astype(np.int64) if int_cells else mat, columns=day_cols)
+    df = pd.concat([
+        pd.DataFrame({"Member_ID": member_ids, "Member_Name": member_names}),
+        days.mean(axis=1).round(0).rename("AVG/d").to_frame(),
+        days,
+    ], axis=1)
+
+    df = df.sort_values(["AVG/d", "Member_Name"], ascending=[False, True], kind="mergesort").reset_index(drop=True)
+    return df
@@ -3,7 +3,8 @@
 SHEET_ID = "1O09PM-hYo-H05kWWqMg71GelEpfaGrePQWzdDCKOqyU"
 
 # === Club list configuration ===
-# Each club defines its own Chronogenesis profile URL and threshold (minimum daily average)
+# Each club defines its own Chronogenesis profile URL and threshold (minimum daily average).
+# Optional "SHEET_ID": export that club to another spreadsheet (the summary stays in SHEET_ID above)
 CLUBS = {
     "1": {
         "title": "EndGame",
@@ -22,3 +23,102 @@ CLUBS = {
     },
     # Add more clubs as needed...
 }
+
+# === Browser pool ===
+# One pool of long-lived browsers is shared by every club in a run
+BROWSER = "edge"
+BROWSER_PATH = "C:/Program Files (x86)/Microsoft/Edge/Application/msedge.exe"
+BROWSER_POOL_SIZE = 1   # number of browser processes
+BROWSER_MAX_TABS = 4    # max concurrent tabs per browser
+
+# Requests the club page does not need to fire its /api/club_profile call are
+# failed before they leave the browser. Resource types are CDP names; URL
+# patterns use * wildcards. Empty both lists (or run with --no-block) if the site changes.
+BROWSER_BLOCK_TYPES = ["Image", "Media", "Font", "Stylesheet", "Manifest", "Ping"]
+BROWSER_BLOCK_URLS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*cloudflareinsights.com*",
+]
+
+# === Fetch mode ===
+# "auto": call the club_profile API directly, fall back to the browser when blocked
+# "http": direct API only, "browser": always drive the browser
+FETCH_MODE = "auto"
+CLUB_API_URL = "https://chronogenesis.net/api/club_profile"
+
+# === Payload cache ===
+# Raw club_profile payloads are cached on disk (next to main.py) for quick reruns / --replay
+CACHE_DIR = "cache"
+CACHE_TTL = 15 * 60     # seconds before a cached payload is fetched again
+CACHE_MAX_MB = 200      # oldest payloads are evicted above this size
+
+# === Export mode ===
+# "incremental": patch only the changed cells of an existing sheet (restyle only if its size changed)
+# "recreate": delete and rebuild each club sheet on every run
+EXPORT_MODE = "incremental"
+
+# Build new / rebuilt club sheets by copying a hidden, pre-styled template sheet per column
+# layout ("_template N days (...)") instead of sending every formatting request (--templates)
+SHEET_TEMPLATES = False
+
+# Export ALL: send every club's values and formatting in one batched Sheets update
+BATCH_EXPORT_ALL = True
+
+# Max threads for blocking DataFrame building / Google Sheets calls
+WORKER_THREADS = 4
+
+# Clubs fetched / exported at the same time (0: no limit; --fetch-limit / --export-limit).
+# Adaptive: each limit moves between 1 and the value here, down on errors, slowdowns or
+# low memory / busy CPU (psutil, if installed), up while clubs are waiting (--adaptive)
+FETCH_CONCURRENCY = 4
+EXPORT_CONCURRENCY = 4
+ADAPTIVE_CONCURRENCY = True
+
+# Worker processes for building club frames and sheet values (0: build in the threads above).
+# Worth it for many clubs: each process pays the pandas import once per run.
+PROCESS_WORKERS = 0
+
+# DataFrame engine: "numpy" (vectorized) or "pandas" (json_normalize + pivot_table reference)
+FRAME_ENGINE = "numpy"
+
+# --profile writes per-stage timings (JSON lines) here
+PROFILE_DIR = "profiles"
+
+# === History archive ===
+# Every fetched day is kept in a local SQLite file, so history outlives the API's window
+ARCHIVE_ENABLED = True
+ARCHIVE_PATH = "history.sqlite3"
+
+# === Sheets API quota ===
+# Calls are paced to these per-minute limits; 429 / 5xx answers are retried with backoff
+SHEETS_READS_PER_MIN = 60
+SHEETS_WRITES_PER_MIN = 60
+SHEETS_BURST = 10           # calls allowed back to back before pacing starts
+SHEETS_MAX_RETRIES = 6
+
+# Per-club exports: "gspread" (blocking calls in the worker threads) or "async" (one pooled
+# keep-alive HTTP client on the event loop, sheet list cached per spreadsheet; --sheets-backend)
+SHEETS_BACKEND = "gspread"
+SHEETS_MAX_CONNECTIONS = 10
+
+# === Headless / daemon mode ===
+# Last exported history hash per club; unchanged clubs are skipped (--force exports anyway)
+EXPORT_STATE_PATH = "export_state.json"
+DAEMON_INTERVAL = 15 * 60   # seconds between refreshes with --daemon
+# Serve live Prometheus metrics on http://127.0.0.1:METRICS_PORT/metrics (None: off; --metrics-port)
+METRICS_PORT = None
+
+# === Local file exports ===
+# Formats written for every club into EXPORT_DIR (next to main.py), named after EXCEL_NAME:
+# any of "xlsx", "csv", "parquet" (parquet needs pyarrow). Same as --local; --no-sheets skips Google Sheets.
+LOCAL_EXPORTS = []
+EXPORT_DIR = "exports"
+
+# === Cross-club summary ===
+# After an ALL export, this sheet gets every club's totals, averages, members below THRESHOLD,
+# day-over-day change and the top / bottom SUMMARY_TOP_N members (None or --no-summary: off)
+SUMMARY_SHEET = "Summary"
+SUMMARY_TOP_N = 10
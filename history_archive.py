@@ -0,0 +1,196 @@
+import sqlite3
+import threading
+import time
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+
+
+# === Local fan-gain history archive ===
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fan_gain (
+    club             TEXT    NOT NULL,
+    actual_date      INTEGER NOT NULL,
+    friend_viewer_id INTEGER NOT NULL,
+    friend_name      TEXT,
+    gain             NUMERIC,
+    updated_at       REAL    NOT NULL,
+    PRIMARY KEY (club, actual_date, friend_viewer_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fan_gain_member ON fan_gain (friend_viewer_id, actual_date);
+
+-- One row per member across all clubs, kept up to date by every upsert
+CREATE TABLE IF NOT EXISTS member (
+    friend_viewer_id INTEGER PRIMARY KEY,
+    friend_name      TEXT COLLATE NOCASE,
+    club             TEXT    NOT NULL,  -- club of the newest archived day
+    club_since       INTEGER NOT NULL,  -- first day of the current stay in that club
+    previous_club    TEXT,              -- club before the last move, if any
+    first_seen       INTEGER NOT NULL,
+    last_seen        INTEGER NOT NULL,
+    days             INTEGER NOT NULL,  -- archived days, all clubs
+    gain_7d          NUMERIC,           -- fan gain over the 7 / 30 / 60 days up to last_seen
+    gain_30d         NUMERIC,
+    gain_60d         NUMERIC,
+    updated_at       REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS member_name ON member (friend_name);
+"""
+
+UPSERT = """
+INSERT INTO fan_gain (club, actual_date, friend_viewer_id, friend_name, gain, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (club, actual_date, friend_viewer_id) DO UPDATE SET
+    friend_name = excluded.friend_name,
+    gain        = excluded.gain,
+    updated_at  = excluded.updated_at
+WHERE friend_name IS NOT excluded.friend_name OR gain IS NOT excluded.gain
+"""
+
+# Every archived row of the members in temp.touched, all clubs, oldest first (the
+# last fetched row last on a day a member shows up in two clubs)
+MEMBER_HISTORY = """
+SELECT f.friend_viewer_id, f.actual_date, f.club, f.friend_name, f.gain
+FROM temp.touched t CROSS JOIN fan_gain f ON f.friend_viewer_id = t.id  -- CROSS: touched drives the index
+ORDER BY f.friend_viewer_id, f.actual_date, f.updated_at
+"""
+
+UPSERT_MEMBER = """
+INSERT INTO member (friend_viewer_id, friend_name, club, club_since, previous_club, first_seen, last_seen,
+                    days, gain_7d, gain_30d, gain_60d, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (friend_viewer_id) DO UPDATE SET
+    friend_name = excluded.friend_name, club = excluded.club, club_since = excluded.club_since,
+    previous_club = excluded.previous_club, first_seen = excluded.first_seen, last_seen = excluded.last_seen,
+    days = excluded.days, gain_7d = excluded.gain_7d, gain_30d = excluded.gain_30d,
+    gain_60d = excluded.gain_60d, updated_at = excluded.updated_at
+"""
+
+MEMBER_FIELDS = ("friend_viewer_id", "friend_name", "club", "club_since", "previous_club", "first_seen",
+                 "last_seen", "days", "gain_7d", "gain_30d", "gain_60d")
+GAIN_WINDOWS = (7, 30, 60)
+
+
+def member_row(viewer_id: int, rows: list[tuple], now: float) -> tuple:
+    """The member table row (MEMBER_FIELDS + updated_at) from one member's MEMBER_HISTORY rows."""
+    days = {d: (club, name, gain) for _, d, club, name, gain in rows}  # one per day, the last fetched
+    dates = list(days)
+    last_seen = dates[-1]
+    club, name, _ = days[last_seen]
+    # The current stay runs back from the newest day to the last day seen in another club
+    club_since, previous_club = last_seen, None
+    for d in reversed(dates):
+        if days[d][0] != club:
+            previous_club = days[d][0]
+            break
+        club_since = d
+    gains = []
+    for n in GAIN_WINDOWS:
+        window = [g for d, (_, _, g) in days.items() if d > last_seen - n and g is not None]
+        gains.append(sum(window) if window else None)
+    return (viewer_id, name, club, club_since, previous_club, dates[0], last_seen, len(dates), *gains, now)
+
+
+class HistoryArchive:
+    """Append-only SQLite archive of per-day fan gains keyed by (club, date, member).
+
+    The primary key is clustered (WITHOUT ROWID) on club then date, so a
+    club/date-range query is a single index range scan. Upserts are idempotent:
+    re-archiving the same payload changes nothing.
+
+    The `member` table indexes every member across clubs and runs by
+    friend_viewer_id (current club, last move, first / last day, rolling gains).
+    An upsert that changed rows refreshes the rows of that payload's members in
+    the same transaction, so a lookup is one primary-key read.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Used from the event loop and from worker threads; one lock serializes access
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute("CREATE TEMP TABLE touched (id INTEGER PRIMARY KEY)")
+        self._lock = threading.Lock()
+        # Archives from before the member index: build it once from the whole history
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT NOT EXISTS (SELECT 1 FROM member) AND EXISTS (SELECT 1 FROM fan_gain)").fetchone()[0]:
+                ids = [r[0] for r in self._conn.execute("SELECT DISTINCT friend_viewer_id FROM fan_gain")]
+                for i in range(0, len(ids), 5000):
+                    self._refresh_members(ids[i:i + 5000])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def upsert(self, club: str, data: dict) -> int:
+        """Store one club_profile payload; returns the number of new or changed rows."""
+        now = time.time()
+        rows = [
+            (club, rec.get("actual_date"), rec.get("friend_viewer_id"), rec.get("friend_name"),
+             rec.get("adjusted_interpolated_fan_gain"), now)
+            for rec in data.get("club_friend_history") or []
+            if rec.get("actual_date") is not None and rec.get("friend_viewer_id") is not None
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(UPSERT, rows)
+            changed = self._conn.total_changes - before
+            if changed:
+                self._refresh_members({r[2] for r in rows})
+            return changed
+
+    def _refresh_members(self, ids) -> None:
+        # Recompute from the archive, so fetch order never matters; caller holds the lock and transaction
+        now = time.time()
+        self._conn.executemany("INSERT OR IGNORE INTO temp.touched VALUES (?)", ((i,) for i in ids))
+        history = self._conn.execute(MEMBER_HISTORY).fetchall()
+        self._conn.executemany(UPSERT_MEMBER, (member_row(viewer_id, list(rows), now)
+                                               for viewer_id, rows in groupby(history, key=itemgetter(0))))
+        self._conn.execute("DELETE FROM temp.touched")
+
+    def member(self, viewer_id: int) -> dict | None:
+        """The indexed row of one member (MEMBER_FIELDS), or None if never archived."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(MEMBER_FIELDS)} FROM member WHERE friend_viewer_id = ?",
+                                     (viewer_id,)).fetchone()
+        return dict(zip(MEMBER_FIELDS, row)) if row else None
+
+    def find_members(self, name: str, limit: int = 20) -> list[dict]:
+        """Members named `name` (any case), or whose name starts with it when none is."""
+        sql = f"SELECT {', '.join(MEMBER_FIELDS)} FROM member WHERE friend_name {{}} ORDER BY last_seen DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql.format("= ?"), (name, limit)).fetchall()
+            if not rows:
+                prefix = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                rows = self._conn.execute(sql.format("LIKE ? ESCAPE '\\'"), (prefix + "%", limit)).fetchall()
+        return [dict(zip(MEMBER_FIELDS, row)) for row in rows]
+
+    def latest_date(self, club: str):
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(actual_date) FROM fan_gain WHERE club = ?", (club,)).fetchone()
+        return row[0]
+
+    def query(self, club: str, date_from=None, date_to=None):
+        """Yield archived records (API field names) for one club, oldest date first."""
+        sql = ("SELECT actual_date, friend_viewer_id, friend_name, gain FROM fan_gain "
+               "WHERE club = ? AND actual_date >= ? AND actual_date <= ? ORDER BY actual_date, friend_viewer_id")
+        lo = date_from if date_from is not None else -2**63
+        hi = date_to if date_to is not None else 2**63 - 1
+        with self._lock:
+            rows = self._conn.execute(sql, (club, lo, hi)).fetchall()
+        for actual_date, viewer_id, name, gain in rows:
+            yield {
+                "friend_viewer_id": viewer_id,
+                "friend_name": name,
+                "actual_date": actual_date,
+                "adjusted_interpolated_fan_gain": gain,
+            }
+
+    def window_payload(self, club: str, days: int) -> dict:
+        """A club_profile-shaped payload with the club's last `days` archived days."""
+        latest = self.latest_date(club)
+        if latest is None:
+            return {"club_friend_history": []}
+        return {"club_friend_history": list(self.query(club, latest - days + 1, latest))}
@@ -0,0 +1,137 @@
+import csv
+import importlib.util
+import numbers
+import re
+from pathlib import Path
+
+
+# === Local file exports (no Sheets API) ===
+# Same colours as build_format_requests, as hex
+BLUE = "#4F82BD"
+RED = "#FFC7CF"
+GREY = "#BFBFBF"
+BAND_LIGHT = "#DBEBF7"
+BAND_VERY = "#F2F7FA"
+NUMBER_FORMAT = "#,##0"
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, numbers.Number) and not isinstance(v, bool)
+
+
+def write_xlsx(path: Path, df, title: str, threshold: int) -> None:
+    """Styled workbook matching the Google sheet: header, Total / Day AVG rows,
+    number format, banding, gap column, threshold / blank colouring, filter and
+    frozen header. Rows are streamed (constant_memory), so size does not matter.
+    """
+    import xlsxwriter
+
+    from sheet_layout import GAP_COL, build_sheet_values
+
+    values, layout = build_sheet_values(df)
+    header, dcols, gidx = layout["header"], layout["dcols"], layout["gidx"]
+    n_data = layout["n_data_rows"]
+    numeric = [c not in ("Member_ID", "Member_Name", GAP_COL) for c in header]
+
+    wb = xlsxwriter.Workbook(str(path), {"constant_memory": True})
+    try:
+        ws = wb.add_worksheet(re.sub(r"[\[\]:*?/\\]", "_", title)[:31])
+        border = {"border": 1}
+        header_fmt = wb.add_format({**border, "bold": True, "font_color": "white", "bg_color": BLUE,
+                                    "align": "center", "valign": "vcenter"})
+        summary = {num: wb.add_format({**border, "bold": True, "font_color": "white", "bg_color": BLUE,
+                                       **({"num_format": NUMBER_FORMAT} if num else {})}) for num in (False, True)}
+        gap_fmt = wb.add_format({**border, "bg_color": BLUE})
+        band = {(i, num): wb.add_format({**border, "bg_color": color, **({"num_format": NUMBER_FORMAT} if num else {})})
+                for i, color in enumerate((BAND_LIGHT, BAND_VERY)) for num in (False, True)}
+
+        ws.set_column_pixels(0, len(header) - 1, 100)
+        if "Member_Name" in header:
+            ws.set_column_pixels(header.index("Member_Name"), header.index("Member_Name"), 140)
+        if gidx is not None:
+            ws.set_column_pixels(gidx, gidx, 40)
+        ws.freeze_panes(1, 0)
+        ws.autofilter(0, 0, n_data, len(header) - 1)
+
+        for r, row in enumerate(values):
+            if r == 0:
+                formats = [header_fmt] * len(row)
+            elif r > n_data:
+                formats = [summary[num] for num in numeric]
+            else:
+                formats = [band[((r - 1) % 2, num)] for num in numeric]
+            for c, v in enumerate(row):
+                fmt = gap_fmt if c == gidx else formats[c]
+                if v == "" or v is None:
+                    ws.write_blank(r, c, None, fmt)
+                elif _is_number(v):
+                    ws.write_number(r, c, float(v), fmt)
+                else:
+                    ws.write_string(r, c, str(v), fmt)
+
+        # Blank days grey first (it wins over red, as in the sheet), then below-threshold red
+        if n_data:
+            day_cols = [header.index(c) for c in dcols]
+            for c in day_cols:
+                ws.conditional_format(1, c, n_data, c, {"type": "blanks", "stop_if_true": True,
+                                                        "format": wb.add_format({"bg_color": GREY})})
+            red = wb.add_format({"bg_color": RED})
+            for c in day_cols + ([header.index("AVG/d")] if "AVG/d" in header else []):
+                ws.conditional_format(1, c, n_data, c, {"type": "cell", "criteria": "<", "value": threshold,
+                                                        "format": red})
+    finally:
+        wb.close()
+
+
+def write_csv(path: Path, df, title: str, threshold: int) -> None:
+    from sheet_layout import build_sheet_values
+
+    values, _ = build_sheet_values(df)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        # Whole fan counts as 1234567, not 1234567.0
+        csv.writer(f).writerows([int(v) if isinstance(v, float) and v.is_integer() else v for v in row]
+                                for row in values)
+
+
+def write_parquet(path: Path, df, title: str, threshold: int) -> None:
+    # The member table only (no Total / Day AVG rows): it is meant for analysis, not display
+    df.to_parquet(path, index=False)
+
+
+BACKENDS = {"xlsx": write_xlsx, "csv": write_csv, "parquet": write_parquet}
+# Optional packages a format needs (any one of them)
+REQUIRES = {"xlsx": ("xlsxwriter",), "parquet": ("pyarrow", "fastparquet")}
+
+
+def missing_requirement(fmt: str) -> str | None:
+    needs = REQUIRES.get(fmt, ())
+    if needs and not any(importlib.util.find_spec(m) for m in needs):
+        return " or ".join(needs)
+    return None
+
+
+def file_stem(cfg: dict) -> str:
+    name = cfg.get("EXCEL_NAME") or f"{cfg['title']}_export"
+    return re.sub(r'[<>:"/\\|?*]+', "_", Path(name).stem)
+
+
+def export_club_files(data: dict, engine: str, title: str, threshold: int, out_dir: str, stem: str,
+                      formats: tuple[str, ...]) -> list[str]:
+    """Build one club's frame from its payload and write it in every format; returns the paths.
+
+    Pure and picklable, like club_compute.prepare_club, so clubs can be written
+    in worker processes.
+    """
+    from frame_engine import build_dataframe_numpy, build_dataframe_pandas
+
+    df = build_dataframe_numpy(data) if engine == "numpy" else build_dataframe_pandas(data)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = out / f"{stem}.{fmt}"
+        tmp = out / f".{stem}.tmp.{fmt}"  # replaced in one step, so readers never see half a file
+        BACKENDS[fmt](tmp, df, title, threshold)
+        tmp.replace(path)
+        paths.append(str(path))
+    return paths
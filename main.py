@@ -1,21 +1,95 @@
+from __future__ import annotations
+
+import argparse
 import asyncio
+import functools
 import json
+import multiprocessing
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import pandas as pd
-import zendriver as zd
-import gspread
-from google.oauth2.service_account import Credentials
+from typing import TYPE_CHECKING
 import time
 
-from globals import CLUBS, SHEET_ID
+# Only light modules are imported here, so the menu shows up at once. pandas,
+# zendriver, httpx and gspread (and the modules built on them) are imported by
+# the functions that first need them.
+from browser_pool import BrowserPool
+from club_api import ApiBlocked, ClubApiClient, circle_id_from_url
+from club_compute import COMPUTE, prepare_club
+from concurrency import LIMITS, resource_signal
+from export_state import ExportState, history_digest
+from history_archive import HistoryArchive
+from metrics import METRICS
+from local_export import BACKENDS as LOCAL_FORMATS, export_club_files, file_stem, missing_requirement
+from payload_cache import PayloadCache
+from profiling import PROFILER
+from sheets_scheduler import SHEETS, SheetsPermanentError
+from stage_retry import Checkpoint, retry_stages
+from globals import (
+    CLUBS, SHEET_ID,
+    BROWSER, BROWSER_PATH, BROWSER_POOL_SIZE, BROWSER_MAX_TABS,
+    BROWSER_BLOCK_TYPES, BROWSER_BLOCK_URLS,
+    FETCH_MODE, CLUB_API_URL,
+    CACHE_DIR, CACHE_TTL, CACHE_MAX_MB,
+    EXPORT_MODE, BATCH_EXPORT_ALL, WORKER_THREADS, PROCESS_WORKERS,
+    FRAME_ENGINE, PROFILE_DIR,
+    ARCHIVE_PATH, ARCHIVE_ENABLED,
+    SHEETS_READS_PER_MIN, SHEETS_WRITES_PER_MIN, SHEETS_BURST, SHEETS_MAX_RETRIES,
+    EXPORT_STATE_PATH, DAEMON_INTERVAL,
+    LOCAL_EXPORTS, EXPORT_DIR, SHEET_TEMPLATES,
+    SUMMARY_SHEET, SUMMARY_TOP_N,
+    SHEETS_BACKEND, SHEETS_MAX_CONNECTIONS, METRICS_PORT,
+    FETCH_CONCURRENCY, EXPORT_CONCURRENCY, ADAPTIVE_CONCURRENCY,
+)
+
+if TYPE_CHECKING:
+    import gspread
+    import pandas as pd
+
+    from club_store import ClubStore
+    from club_summary import ClubSummary
+    from sheets_async import AsyncSheetsClient
 
 
 # ========== Google Sheets config ==========
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-CREDS = Credentials.from_service_account_file("credentials.json", scopes=SCOPES)
-GC = gspread.authorize(CREDS)
+_GC: gspread.Client | None = None
+_GC_LOCK = threading.Lock()
+_TEMPLATE_LOCK = threading.Lock()  # clubs exported concurrently must not add the same template twice
+
+
+def get_credentials():
+    from google.oauth2.service_account import Credentials
+
+    return Credentials.from_service_account_file("credentials.json", scopes=SCOPES)
+
+
+def get_gc() -> gspread.Client:
+    # Authorized on the first Sheets call: runs that write nothing never touch Google auth
+    global _GC
+    with _GC_LOCK:
+        if _GC is None:
+            import gspread
+
+            _GC = gspread.authorize(get_credentials())
+        return _GC
+
+
+def club_sheet_id(cfg: dict) -> str:
+    # A club may name its own spreadsheet ("SHEET_ID" in its CLUBS entry); the summary stays in SHEET_ID
+    return cfg.get("SHEET_ID") or SHEET_ID
+
+
+def make_sheets_client(backend: str) -> AsyncSheetsClient | None:
+    # "async": per-club exports go over one pooled asyncio HTTP client instead of gspread in threads
+    if backend != "async":
+        return None
+    from sheets_async import AsyncSheetsClient
+
+    return AsyncSheetsClient(get_credentials(), max_connections=SHEETS_MAX_CONNECTIONS)
 
 
 # === Club selection ===
@@ -33,6 +107,15 @@ def pick_club() -> dict | str:
     return CLUBS[choice]
 
 
+def club_from_arg(value: str) -> dict | str:
+    # Headless counterpart of pick_club(): "0" / "all" or a CLUBS key
+    if value.lower() in ("0", "all"):
+        return "ALL"
+    if value not in CLUBS:
+        raise SystemExit(f"Unknown club {value!r}; expected 0/all or one of: {', '.join(CLUBS)}")
+    return CLUBS[value]
+
+
 # === Paths ===
 def resolve_base_dir() -> Path:
     if getattr(sys, "frozen", False):
@@ -41,337 +124,433 @@ def resolve_base_dir() -> Path:
 
 
 # === Data fetch ===
-async def fetch_json(URL: str):
+def make_browser_pool(block: bool = True) -> BrowserPool:
+    return BrowserPool(
+        size=BROWSER_POOL_SIZE,
+        max_tabs=BROWSER_MAX_TABS,
+        browser=BROWSER,
+        executable_path=BROWSER_PATH,
+        block_types=BROWSER_BLOCK_TYPES if block else (),
+        block_urls=BROWSER_BLOCK_URLS if block else (),
+    )
+
+
+async def fetch_json(URL: str, pool: BrowserPool | None = None):
+    import zendriver as zd
+
     MAX_RETRIES = 3
     RETRY_DELAY = 5
-    
-    for attempt in range(MAX_RETRIES):
-        browser = None
+
+    # Without a shared pool (legacy callers) use a private one for this fetch only
+    owns_pool = pool is None
+    if owns_pool:
+        pool = make_browser_pool()
+
+    try:
+        for attempt in range(MAX_RETRIES):
+            try:
+                # The tab is closed as soon as the API response body is in hand
+                async with pool.tab() as (page, traffic):
+                    async with page.expect_request(r".*\/api\/club_profile.*") as req:
+                        with PROFILER.span("fetch.page_load", club=URL, attempt=attempt + 1):
+                            # Navigate without waiting for the page to finish loading: only its XHR matters
+                            await page.send(zd.cdp.page.navigate(URL))
+                        with PROFILER.span("fetch.wait_request", club=URL):
+                            await req.value
+                        with PROFILER.span("fetch.response_body", club=URL) as sp:
+                            body, _ = await req.response_body
+                            sp["bytes"] = len(body)
+                            sp["page_bytes"] = traffic.loaded_bytes
+                            sp["page_requests"] = traffic.requests
+                            sp["blocked"] = traffic.blocked_total
+
+                with PROFILER.span("fetch.json_decode", club=URL):
+                    text = body.decode("utf-8", errors="replace") if isinstance(body, (bytes, bytearray)) else str(body)
+                    return json.loads(text)
+
+            except (zd.errors.RemoteDisconnectedError, zd.errors.ConnectionAbortedError) as e:
+                # The pool health-checks the browser on the next tab() and relaunches it if needed
+                PROFILER.event("fetch.retry", club=URL, attempt=attempt + 1, error=type(e).__name__)
+                print(f"Lỗi kết nối ({URL}, lần {attempt + 1}/{MAX_RETRIES}): {type(e).__name__}. Đang thử lại sau {RETRY_DELAY}s...")
+                if attempt < MAX_RETRIES - 1:
+                    await asyncio.sleep(RETRY_DELAY)
+                    continue
+                else:
+                    raise
+    finally:
+        if owns_pool:
+            await pool.close()
+
+    raise Exception(f"Thất bại sau {MAX_RETRIES} lần thử.")
+
+
+def make_api_client(mode: str, api_url: str = CLUB_API_URL) -> ClubApiClient | None:
+    # "browser" → no direct client; "http" → direct only; "auto" → direct, browser on block
+    if mode == "browser":
+        return None
+    return ClubApiClient(api_url, fallback=(mode == "auto"))
+
+
+async def fetch_club(URL: str, pool: BrowserPool | None = None, api: ClubApiClient | None = None):
+    if api is not None:
         try:
-            browser = await zd.start(
-                browser="edge",
-                browser_executable_path="C:/Program Files (x86)/Microsoft/Edge/Application/msedge.exe"
-            )
-            page = await browser.get("https://google.com")
-            
-            async with page.expect_request(r".*\/api\/club_profile.*") as req:
-                await page.get(URL)
-                await req.value
-                body, _ = await req.response_body
-            
-            text = body.decode("utf-8", errors="replace") if isinstance(body, (bytes, bytearray)) else str(body)
-            return json.loads(text)
-            
-        except (zd.errors.RemoteDisconnectedError, zd.errors.ConnectionAbortedError) as e:
-            print(f"Lỗi kết nối ({URL}, lần {attempt + 1}/{MAX_RETRIES}): {type(e).__name__}. Đang thử lại sau {RETRY_DELAY}s...")
-            if attempt < MAX_RETRIES - 1:
-                if browser:
-                    await browser.stop()
-                await asyncio.sleep(RETRY_DELAY)
-                continue
-            else:
+            return await api.fetch(URL)
+        except ApiBlocked as e:
+            PROFILER.event("fetch.blocked", club=URL, reason=str(e))
+            if not api.fallback:
                 raise
-                
-        except Exception as e:
-            raise e
-            
-        finally:
-            if browser:
-                await browser.stop()
-    
-    raise Exception(f"Thất bại sau {MAX_RETRIES} lần thử.")
+            print(f"🛡️ Direct API blocked for {URL} ({e}), falling back to browser...")
+    return await fetch_json(URL, pool=pool)
+
+
+def make_payload_cache() -> PayloadCache:
+    return PayloadCache(resolve_base_dir() / CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_MB * 1024 * 1024)
+
+
+def make_history_archive() -> HistoryArchive:
+    return HistoryArchive(resolve_base_dir() / ARCHIVE_PATH)
+
+
+def make_export_state(force: bool = False) -> ExportState:
+    return ExportState(resolve_base_dir() / EXPORT_STATE_PATH, force=force)
+
+
+class ClubFetcher:
+    """Per-run fetch state: browser pool, direct API client, raw payload cache
+    and history archive.
+
+    In replay mode only cached payloads are used (whatever their age) and the
+    network is never touched. Fresh payloads are upserted into the archive; with
+    `window_days` the returned payload is that many archived days instead of the
+    API's own window.
+    """
+
+    def __init__(self, pool: BrowserPool, api: ClubApiClient | None = None,
+                 cache: PayloadCache | None = None, replay: bool = False,
+                 archive: HistoryArchive | None = None, window_days: int | None = None):
+        self.pool = pool
+        self.api = api
+        self.cache = cache
+        self.replay = replay
+        self.archive = archive
+        self.window_days = window_days
+
+    async def fetch(self, URL: str) -> dict:
+        data = await self._fetch_payload(URL)
+        if self.archive is not None and self.window_days:
+            data = await asyncio.to_thread(self.archive.window_payload, circle_id_from_url(URL), self.window_days)
+        return data
+
+    async def _fetch_payload(self, URL: str) -> dict:
+        if self.cache is not None:
+            data = self.cache.get(URL, allow_stale=self.replay)
+            PROFILER.event("cache.hit" if data is not None else "cache.miss", club=URL)
+            if data is not None:
+                return data
+        if self.replay:
+            raise Exception(f"No cached payload for {URL} (replay mode)")
+
+        async with LIMITS.slot("fetch"):
+            with PROFILER.span("fetch", club=URL):
+                data = await fetch_club(URL, pool=self.pool, api=self.api)
+        if self.cache is not None:
+            self.cache.put(URL, data)
+        if self.archive is not None:
+            with PROFILER.span("archive.upsert", club=URL) as sp:
+                sp["rows"] = await asyncio.to_thread(self.archive.upsert, circle_id_from_url(URL), data)
+        return data
+
+    async def close(self) -> None:
+        await self.pool.close()
+        if self.api is not None:
+            await self.api.close()
+        if self.archive is not None:
+            self.archive.close()
 
 
 # === DataFrame processing ===
-def build_dataframe(data: dict) -> pd.DataFrame:
-    df = pd.json_normalize(data.get("club_friend_history") or [])
-    for c in ("friend_viewer_id", "friend_name", "actual_date", "adjusted_interpolated_fan_gain"):
-        if c not in df.columns:
-            df[c] = pd.NA
-
-    df = (
-        df.assign(day_col=lambda d: "Day " + d["actual_date"].astype(str))
-            .pivot_table(
-                index=["friend_viewer_id", "friend_name"],
-                columns="day_col",
-                values="adjusted_interpolated_fan_gain",
-                aggfunc="first"
-            )
-            .reset_index()
-    )
-    df.columns.name = None
+def member_count(data: dict) -> int:
+    return len({rec.get("friend_viewer_id") for rec in data.get("club_friend_history") or ()})
+
+
+def build_dataframe(data: dict, club: str | None = None) -> pd.DataFrame:
+    from frame_engine import build_dataframe_numpy, build_dataframe_pandas
+
+    with PROFILER.span("build_dataframe", club=club, engine=FRAME_ENGINE) as sp:
+        df = build_dataframe_numpy(data) if FRAME_ENGINE == "numpy" else build_dataframe_pandas(data)
+        sp["rows"] = len(data.get("club_friend_history") or [])
+        sp["members"] = len(df)
+    return df
+
+
+async def prepare_in_process(data: dict, club: str) -> tuple[list[list], dict]:
+    with PROFILER.span("prepare_club", club=club, engine=FRAME_ENGINE, workers=COMPUTE.workers) as sp:
+        values, layout = await COMPUTE.run(prepare_club, data, FRAME_ENGINE)
+        sp["rows"] = len(data.get("club_friend_history") or [])
+        sp["members"] = layout["n_data_rows"]
+    return values, layout
 
-    def _day_num(x: str):
-        if not isinstance(x, str) or not x.startswith("Day "):
-            return None
-        try:
-            return int(x.split(maxsplit=1)[1])
-        except Exception:
-            return None
-
-    day_cols = [c for c in df.columns if isinstance(c, str) and c.startswith("Day ")]
-
-    # --- Keep only members who have value on the newest day (max Day N) ---
-    nums = [n for n in map(_day_num, day_cols) if n is not None]
-    if nums:
-        latest_day = max(nums)
-        latest_col = f"Day {latest_day}"
-        if latest_col in df.columns:
-            df = df[~df[latest_col].isna()].copy()
-
-    # Order Day columns numerically
-    day_cols = sorted(day_cols, key=lambda c: (_day_num(c) if _day_num(c) is not None else float("inf")))
-
-    # Compute AVG/d and finalize columns
-    df["AVG/d"] = df[day_cols].mean(axis=1).round(0) if day_cols else 0
-    df = df[["friend_viewer_id", "friend_name", "AVG/d"] + day_cols].rename(
-        columns={"friend_viewer_id": "Member_ID", "friend_name": "Member_Name"}
-    )
-    df["Member_ID"] = df["Member_ID"].fillna("").astype(str)
-    df["Member_Name"] = df["Member_Name"].fillna("").astype(str)
-    for c in df.columns:
-        if c not in ("Member_ID", "Member_Name"):
-            df[c] = pd.to_numeric(df[c], errors="coerce")
 
-    df = df.sort_values(["AVG/d", "Member_Name"], ascending=[False, True], kind="mergesort").reset_index(drop=True)
+def build_store_frame(store: ClubStore, club: str) -> pd.DataFrame:
+    with PROFILER.span("build_dataframe", club=club, engine="store") as sp:
+        df = store.frame(club)
+        sp["members"] = len(df)
     return df
 
 
+# === Local file export ===
+async def export_local_files(cfg: dict, data: dict, formats: tuple[str, ...]) -> list[str]:
+    # Pure like prepare_club: a worker process with PROCESS_WORKERS, else the thread pool
+    title = cfg["title"]
+    args = (data, FRAME_ENGINE, title, cfg["THRESHOLD"], str(resolve_base_dir() / EXPORT_DIR), file_stem(cfg), formats)
+    with PROFILER.span("local_export", club=title, formats=",".join(formats)) as sp:
+        paths = await (COMPUTE.run(export_club_files, *args) if COMPUTE.workers
+                       else asyncio.to_thread(export_club_files, *args))
+        sp["bytes"] = sum(os.path.getsize(p) for p in paths)
+    print(f"💾 {title} written to " + ", ".join(Path(p).name for p in paths))
+    return paths
+
+
 # === Google Sheets export ===
-def export_to_gsheets(df: pd.DataFrame, spreadsheet_id: str, sheet_title: str, threshold: int):
+def build_sheet_rows(data: dict, club: str | None = None) -> tuple[list[list], dict]:
+    from sheet_layout import build_sheet_values
+
+    return build_sheet_values(build_dataframe(data, club))
+
+
+def export_to_gsheets(df: pd.DataFrame, spreadsheet_id: str, sheet_title: str, threshold: int,
+                      mode: str = EXPORT_MODE, templates: bool = SHEET_TEMPLATES):
+    from sheet_layout import build_sheet_values
+
+    values, layout = build_sheet_values(df)
+    export_sheet_values(values, layout, spreadsheet_id, sheet_title, threshold, mode=mode, templates=templates)
+
+
+def export_sheet_values(values: list[list], layout: dict, spreadsheet_id: str, sheet_title: str, threshold: int,
+                        mode: str = EXPORT_MODE, templates: bool = SHEET_TEMPLATES,
+                        checkpoint: Checkpoint | None = None):
+    # Network side of export_to_gsheets, for values built elsewhere (e.g. a worker process).
+    # With a checkpoint, written values are recorded as stage "values" (with the formatting
+    # still to send), so a retry after a formatting failure only sends the formatting.
     from gspread.utils import rowcol_to_a1
+    from sheet_layout import build_format_requests
+    from sheet_templates import usable
 
-    # ====== PREP DATA ======
-    GAP_COL = " "
-    dcols = [c for c in df.columns if isinstance(c, str) and c.startswith("Day ")]
-    df_to_write = df.copy()
+    header = layout["header"]
+    templates = templates and usable(layout)
 
-    # Add Total and a blue gap column before it
-    if dcols:
-        df_to_write["Total"] = df_to_write[dcols].sum(axis=1, min_count=1)
-        gidx = df_to_write.columns.get_loc("Total")
-        df_to_write.insert(gidx, GAP_COL, "")
-    else:
-        gidx = None
-
-    # Bottom "Total" row (sum)
-    bottom_totals = {}
-    for c in df_to_write.columns:
-        if c == "Member_Name":
-            bottom_totals[c] = "Total"
-        elif c in ("Member_ID", GAP_COL):
-            bottom_totals[c] = ""
-        else:
-            bottom_totals[c] = pd.to_numeric(df_to_write[c], errors="coerce").sum(min_count=1)
-
-    # Day AVG row — per-day means only (no AVG/d)
-    day_avgs = pd.Series("", index=df_to_write.columns, dtype=object)
-    if dcols:
-        means = df_to_write[dcols].mean(axis=0, skipna=True).round(0)
-        for c in dcols:
-            day_avgs[c] = means.get(c, "")
-    day_avgs["Member_Name"] = "Day AVG"
-
-    header = list(map(str, df_to_write.columns))
-    data_rows = df_to_write.where(pd.notna(df_to_write), "").values.tolist()
-    totals_row = [("" if pd.isna(v) else v) for v in (bottom_totals.get(c, "") for c in df_to_write.columns)]
-    day_avg_row = [day_avgs.get(c, "") for c in df_to_write.columns]
-
-    # Values order: header, data..., Total, Day AVG
-    values = [header] + data_rows + [totals_row, day_avg_row]
-
-    # ====== OPEN SHEET ======
-    ss = GC.open_by_key(spreadsheet_id)
-    for ws in ss.worksheets():
-        if ws.title == sheet_title:
-            ss.del_worksheet(ws)
-            break
-    ws = ss.add_worksheet(title=sheet_title, rows=max(len(values) + 50, 120), cols=max(len(header) + 10, 26))
+    with PROFILER.span("sheets.open", club=sheet_title):
+        ss = SHEETS.call("read", get_gc().open_by_key, spreadsheet_id)
+        if checkpoint is not None and "values" in checkpoint:
+            _apply_format(ss, sheet_title, checkpoint.get("values"), checkpoint)
+            return
+        existing = next((ws for ws in SHEETS.call("read", ss.worksheets) if ws.title == sheet_title), None)
+
+    if checkpoint is not None:
+        checkpoint.stage = "values"
+    if mode == "incremental" and existing is not None:
+        _patch_worksheet(ss, existing, values, layout, threshold, templates=templates, checkpoint=checkpoint)
+        return
+
+    if templates:
+        _clone_worksheet(ss, values, layout, sheet_title, threshold)
+        return
+
+    # ====== RECREATE SHEET ======
+    with PROFILER.span("sheets.recreate", club=sheet_title):
+        if existing is not None:
+            SHEETS.call("write", ss.del_worksheet, existing)
+        ws = SHEETS.call("write", ss.add_worksheet,
+                         title=sheet_title, rows=max(len(values) + 50, 120), cols=max(len(header) + 10, 26))
 
     # Write values
-    end_row = len(values)
-    end_col = len(header)
-    end_a1 = rowcol_to_a1(end_row, end_col)
-    ws.update(values, f"A1:{end_a1}")
+    end_a1 = rowcol_to_a1(len(values), len(header))
+    with PROFILER.span("sheets.update", club=sheet_title) as sp:
+        SHEETS.call("write", ws.update, values, f"A1:{end_a1}")
+        sp["bytes"] = _payload_bytes(values)
 
     # ====== FORMATTING ======
-    sheet_id = ws._properties["sheetId"]
-    last_data_row_1based = 1 + len(data_rows)  # header + data (excludes the 2 summary rows)
-
-    header_range = {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": 1, "startColumnIndex": 0, "endColumnIndex": end_col}
-    totals_range = {"sheetId": sheet_id, "startRowIndex": end_row - 2, "endRowIndex": end_row, "startColumnIndex": 0, "endColumnIndex": end_col}
-    header_plus_data_range = {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": last_data_row_1based, "startColumnIndex": 0, "endColumnIndex": end_col}
-    band_left = {"sheetId": sheet_id, "startRowIndex": 1, "endRowIndex": last_data_row_1based, "startColumnIndex": 0, "endColumnIndex": (gidx if gidx is not None else end_col)}
-    band_right = {"sheetId": sheet_id, "startRowIndex": 1, "endRowIndex": last_data_row_1based,
-                  "startColumnIndex": (gidx + 1 if gidx is not None else end_col), "endColumnIndex": end_col}
-    full_table_range = {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": end_row, "startColumnIndex": 0, "endColumnIndex": end_col}
-
-    # Column index helpers
-    def col_1_based(col_name: str) -> int | None:
-        try:
-            return header.index(col_name) + 1
-        except ValueError:
-            return None
-
-    # Number formatting applies to all numeric columns except id/name/gap
-    skip_for_number = {"Member_ID", "Member_Name", GAP_COL}
-    numeric_cols_1 = [i + 1 for i, c in enumerate(header) if c not in skip_for_number]
-
-    # Conditional threshold: Day columns + AVG/d (data rows only).
-    day_cols_1 = [col_1_based(c) for c in dcols]
-    day_cols_1 = [c1 for c1 in day_cols_1 if c1 is not None]
-
-    def col_range_rows(start_row_1, end_row_1, col_1):
-        return {"sheetId": sheet_id, "startRowIndex": start_row_1 - 1, "endRowIndex": end_row_1,
-                "startColumnIndex": col_1 - 1, "endColumnIndex": col_1}
-
-    numeric_ranges_all = [col_range_rows(2, end_row, c1) for c1 in numeric_cols_1]
-    numeric_ranges_data_days = [col_range_rows(2, last_data_row_1based, c1) for c1 in day_cols_1]
-
-    # NEW: add AVG/d to the threshold-based red rule (data rows only)
-    avgd_col_1 = col_1_based("AVG/d")
-    numeric_ranges_data = list(numeric_ranges_data_days)
-    if avgd_col_1 is not None:
-        numeric_ranges_data.append(col_range_rows(2, last_data_row_1based, avgd_col_1))
-
-    blue_fill  = {"red": 0.31, "green": 0.51, "blue": 0.74}
-    white_font = {"red": 1, "green": 1, "blue": 1}
-    red_fill   = {"red": 1.00, "green": 0.78, "blue": 0.81}
-    grey_fill  = {"red": 0.75, "green": 0.75, "blue": 0.75}
-    band_light = {"red": 0.86, "green": 0.92, "blue": 0.97}
-    band_very  = {"red": 0.95, "green": 0.97, "blue": 0.98}
-    number_format = {"type": "NUMBER", "pattern": "#,##0"}
-
-    requests = [
-        {"setBasicFilter": {"filter": {"range": header_plus_data_range}}},
-
-        # Header styling
-        {
-            "repeatCell": {
-                "range": header_range,
-                "cell": {"userEnteredFormat": {
-                    "backgroundColor": blue_fill,
-                    "textFormat": {"bold": True, "foregroundColor": white_font},
-                    "horizontalAlignment": "CENTER",
-                    "verticalAlignment": "MIDDLE"
-                }},
-                "fields": "userEnteredFormat(backgroundColor,textFormat,horizontalAlignment,verticalAlignment)"
-            }
-        },
-
-        # Style both "Total" and "Day AVG" rows
-        {
-            "repeatCell": {
-                "range": totals_range,
-                "cell": {"userEnteredFormat": {"backgroundColor": blue_fill, "textFormat": {"bold": True, "foregroundColor": white_font}}},
-                "fields": "userEnteredFormat(backgroundColor,textFormat)"
-            }
-        },
-
-        # GAP column blue & narrow
-        *([
-            {
-                "repeatCell": {
-                    "range": {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": end_row, "startColumnIndex": gidx, "endColumnIndex": gidx + 1},
-                    "cell": {"userEnteredFormat": {"backgroundColor": blue_fill}},
-                    "fields": "userEnteredFormat.backgroundColor"
-                }
-            },
-            {
-                "updateDimensionProperties": {
-                    "range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": gidx, "endIndex": gidx + 1},
-                    "properties": {"pixelSize": 40},
-                    "fields": "pixelSize"
-                }
-            }
-        ] if gidx is not None else []),
-
-        # Alternating banded rows (data only)
-        *([
-            {"addBanding": {"bandedRange": {"range": band_left,  "rowProperties": {"firstBandColor": band_light, "secondBandColor": band_very}}}}
-        ] if gidx is None or gidx > 0 else []),
-        *([
-            {"addBanding": {"bandedRange": {"range": band_right, "rowProperties": {"firstBandColor": band_light, "secondBandColor": band_very}}}}
-        ] if gidx is not None and gidx + 1 < end_col else []),
-
-        # Number formatting for all numeric columns (AVG/d, Day N, Total)
-        *[
-            {"repeatCell": {"range": r, "cell": {"userEnteredFormat": {"numberFormat": number_format}}, "fields": "userEnteredFormat.numberFormat"}}
-            for r in numeric_ranges_all
-        ],
-
-        # Conditional red (below threshold) — Day N columns + AVG/d, data rows only
-        *([{
-            "addConditionalFormatRule": {
-                "rule": {"ranges": numeric_ranges_data,
-                         "booleanRule": {"condition": {"type": "NUMBER_LESS",
-                                                       "values": [{"userEnteredValue": str(threshold)}]},
-                                         "format": {"backgroundColor": red_fill}}},
-                "index": 0
-            }
-        }] if numeric_ranges_data else []),
-
-        # Conditional grey (blanks) — ONLY for Day N columns, data rows
-        *([{
-            "addConditionalFormatRule": {
-                "rule": {"ranges": numeric_ranges_data_days,
-                         "booleanRule": {"condition": {"type": "BLANK"},
-                                         "format": {"backgroundColor": grey_fill}}},
-                "index": 0
-            }
-        }] if numeric_ranges_data_days else []),
-
-        # Borders on all cells
-        {
-            "updateBorders": {
-                "range": full_table_range,
-                "top": {"style": "SOLID"},
-                "bottom": {"style": "SOLID"},
-                "left": {"style": "SOLID"},
-                "right": {"style": "SOLID"},
-                "innerHorizontal": {"style": "SOLID"},
-                "innerVertical": {"style": "SOLID"},
-            }
-        },
-    ]
-
-    # Wider Member_Name (for filter icon space)
-    if "Member_Name" in header:
-        name_col_index = header.index("Member_Name")
-        requests.append({
-            "updateDimensionProperties": {
-                "range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": name_col_index, "endIndex": name_col_index + 1},
-                "properties": {"pixelSize": 140},
-                "fields": "pixelSize"
-            }
-        })
-
-    # Freeze header
-    requests.append({
-        "updateSheetProperties": {
-            "properties": {"sheetId": sheet_id, "gridProperties": {"frozenRowCount": 1}},
-            "fields": "gridProperties.frozenRowCount"
-        }
-    })
+    _apply_format(ss, sheet_title, build_format_requests(ws.id, layout, threshold), checkpoint)
+
+
+def _apply_format(ss, sheet_title: str, requests: list[dict], checkpoint: Checkpoint | None = None):
+    # The values are in: from here on a retry only needs to resend these requests
+    if checkpoint is not None:
+        checkpoint.record("values", requests)
+        checkpoint.stage = "format"
+    with PROFILER.span("sheets.batch_update", club=sheet_title, requests=len(requests)) as sp:
+        SHEETS.call("write", ss.batch_update, {"requests": requests})
+        sp["bytes"] = _payload_bytes(requests)
+
+
+def _payload_bytes(payload) -> int:
+    # Only serialized when profiling (the span discards it otherwise)
+    return len(json.dumps(payload, default=float)) if PROFILER.enabled else 0
+
+
+def _clone_worksheet(ss, values: list[list], layout: dict, sheet_title: str, threshold: int):
+    # New or rebuilt sheet as a copy of its pre-styled template: one batchUpdate in all
+    from batch_export import update_cells_request
+    from sheet_templates import TemplateSheets
+
+    with _TEMPLATE_LOCK:
+        worksheets = SHEETS.call("read", ss.worksheets)
+        cloner = TemplateSheets({ws.title: {"sheetId": ws.id, "title": ws.title, "index": ws.index} for ws in worksheets},
+                                {ws.id for ws in worksheets})
+        sheet_id, requests = cloner.clone(sheet_title, layout, threshold)
+        requests += [update_cells_request(sheet_id, 0, 0, values)] + cloner.cleanup_requests()
+        with PROFILER.span("sheets.batch_update", club=sheet_title, requests=len(requests), template=True) as sp:
+            SHEETS.call("write", ss.batch_update, {"requests": requests})
+            sp["bytes"] = _payload_bytes(requests)
+
+
+def _patch_worksheet(ss, ws, values: list[list], layout: dict, threshold: int, templates: bool = False,
+                     checkpoint: Checkpoint | None = None):
+    from gspread.utils import rowcol_to_a1
+    import sheet_diff
+    from sheet_layout import build_format_requests
+
+    # Read the current sheet once (values + formatting state), then send only what changed
+    with PROFILER.span("sheets.read", club=ws.title):
+        sheet = SHEETS.call("read", sheet_diff.fetch_sheet_state, ss, ws.title)
+        old_values = sheet_diff.grid_values(sheet)
+
+    if sheet_diff.layout_unchanged(sheet, old_values, values, threshold):
+        changed = sheet_diff.diff_ranges(old_values, values)
+        if changed:
+            with PROFILER.span("sheets.update", club=ws.title, ranges=len(changed)) as sp:
+                SHEETS.call("write", ws.batch_update, changed)
+                sp["bytes"] = _payload_bytes(changed)
+        return
+
+    if templates:
+        _clone_worksheet(ss, values, layout, ws.title, threshold)
+        return
+
+    # Column / row extents or threshold changed: rewrite in place and restyle
+    grow = sheet_diff.grow_grid_request(sheet, len(values) + 50, len(values[0]) + 10)
+    if grow is not None:
+        SHEETS.call("write", ss.batch_update, {"requests": [grow]})
+
+    padded = sheet_diff.padded_values(old_values, values)
+    with PROFILER.span("sheets.update", club=ws.title) as sp:
+        SHEETS.call("write", ws.update, padded, f"A1:{rowcol_to_a1(len(padded), len(padded[0]))}")
+        sp["bytes"] = _payload_bytes(padded)
+    requests = sheet_diff.reset_format_requests(sheet) + build_format_requests(ws.id, layout, threshold)
+    _apply_format(ss, ws.title, requests, checkpoint)
+
+# === Member lookup (python main.py member ID_OR_NAME ...) ===
+def format_member(m: dict, titles: dict[str, str]) -> str:
+    club = titles.get(m["club"], m["club"])
+    moved = f" (moved from {titles.get(m['previous_club'], m['previous_club'])})" if m["previous_club"] else ""
+    gains = " · ".join(f"{n}d {m[f'gain_{n}d']:,.0f}" if m[f"gain_{n}d"] is not None else f"{n}d -" for n in (7, 30, 60))
+    return (f"👤 {m['friend_name']} ({m['friend_viewer_id']})\n"
+            f"    Club: {club} since day {m['club_since']}{moved}\n"
+            f"    Seen: day {m['first_seen']} → day {m['last_seen']}, {m['days']} archived day(s)\n"
+            f"    Gain: {gains}")
+
+
+def lookup_members(queries: list[str]) -> int:
+    """Print the member index rows matching each friend_viewer_id or name; 1 if nothing matched."""
+    path = resolve_base_dir() / ARCHIVE_PATH
+    if not path.exists():
+        print(f"No history archive at {path} yet: run an export first (ARCHIVE_ENABLED).")
+        return 1
+    titles = {circle_id_from_url(c["URL"]): c["title"] for c in CLUBS.values()}
+    archive = HistoryArchive(path)
+    found = 0
+    try:
+        for query in queries:
+            member = archive.member(int(query)) if query.isdigit() else None
+            members = [member] if member is not None else archive.find_members(query)
+            if not members:
+                print(f"❔ No member matches '{query}'.")
+            for m in members:
+                print(format_member(m, titles))
+            found += len(members)
+    finally:
+        archive.close()
+    return 0 if found else 1
+
+# === Cross-club summary sheet ===
+def make_summary() -> ClubSummary:
+    from club_summary import ClubSummary
+
+    return ClubSummary(top_n=SUMMARY_TOP_N)
+
+
+def add_payload_to_summary(summary: ClubSummary, cfg: dict, data: dict) -> None:
+    # A club skipped as unchanged still belongs on the summary: build its frame from the fetched payload
+    summary.add(cfg["title"], build_dataframe(data, cfg["title"]), cfg["THRESHOLD"])
 
-    ws.spreadsheet.batch_update({"requests": requests})
+
+async def export_summary(summary: ClubSummary, sheet_title: str) -> None:
+    """Write the summary sheet from the club rows collected during the export (nothing is read back)."""
+    from club_summary import write_summary
+
+    with PROFILER.span("summary", clubs=len(summary)):
+        values, layout = await asyncio.to_thread(summary.build, [cfg["title"] for cfg in CLUBS.values()])
+        try:
+            await asyncio.to_thread(write_summary, get_gc(), SHEET_ID, sheet_title, values, layout)
+        except Exception as e:
+            print(f"⚠️ Could not write the summary sheet: {e}")
+            return
+    print(f"📊 Summary sheet '{sheet_title}' updated ({layout['n_clubs']} club(s)).")
 
 # === Core Export Logic (Single Club) ===
-async def process_and_export_club(cfg: dict, data_or_task_result=None):
+async def process_and_export_club(cfg: dict, data_or_task_result=None, fetcher: ClubFetcher | None = None,
+                                  export_mode: str = EXPORT_MODE, changes: ExportState | None = None,
+                                  local: tuple[str, ...] = (), sheets: bool = True,
+                                  templates: bool = SHEET_TEMPLATES, checkpoint: Checkpoint | None = None,
+                                  sheets_client: AsyncSheetsClient | None = None):
+    # Every stage goes through the checkpoint: called again with the same one after a
+    # failure, it resumes at the failed stage (an export error never fetches again)
     title = cfg['title']
-    
-    # If data_or_task_result is an Exception (initial fetch error) or needs re-fetching
-    if isinstance(data_or_task_result, Exception) or data_or_task_result is None:
-        print(f"    (Re-fetching data for {title}...)")
-        # This calls the fetch_json function, which contains its own 3-retry logic for connection errors
-        data = await fetch_json(cfg["URL"]) 
+    checkpoint = checkpoint or Checkpoint()
+
+    # If data was successfully fetched during the initial concurrent run
+    if data_or_task_result is not None and not isinstance(data_or_task_result, Exception):
+        checkpoint.seed("fetch", data_or_task_result)
+    if "fetch" not in checkpoint:
+        print(f"    (Fetching data for {title}...)")
+    # This calls the fetch_json function, which contains its own 3-retry logic for connection errors
+    data = await checkpoint.run("fetch", fetcher.fetch if fetcher is not None else fetch_json, cfg["URL"])
+
+    # Local files are cheap and always rewritten; they do not depend on the Sheets state
+    if local:
+        await checkpoint.run("local", export_local_files, cfg, data, local)
+    if not sheets:
+        return False
+
+    # Same history as the last export: nothing to build or write
+    digest = None
+    if changes is not None:
+        digest = await checkpoint.run("check", asyncio.to_thread, history_digest, data, cfg["THRESHOLD"],
+                                      club_sheet_id(cfg))
+        if changes.unchanged(title, digest):
+            changes.mark_checked(title)
+            PROFILER.event("club.unchanged", club=title, members=member_count(data))
+            print(f"⏭️ {title} unchanged since the last export, skipped.")
+            return False
+
+    # Process and export (pandas / gspread block, so they run in the worker thread pool;
+    # with PROCESS_WORKERS the build runs in a worker process instead)
+    if COMPUTE.workers:
+        values, layout = await checkpoint.run("build", prepare_in_process, data, title)
     else:
-        # If data was successfully fetched during the initial concurrent run
-        data = data_or_task_result
+        values, layout = await checkpoint.run("build", asyncio.to_thread, build_sheet_rows, data, title)
+    async with LIMITS.slot("export"):
+        if sheets_client is not None:
+            from sheets_async import export_club_sheet
 
-    # Process and export
-    df = build_dataframe(data)
-    export_to_gsheets(df, spreadsheet_id=SHEET_ID, sheet_title=title, threshold=cfg["THRESHOLD"])
+            await checkpoint.run("export", export_club_sheet, sheets_client, club_sheet_id(cfg), title, values,
+                                 layout, cfg["THRESHOLD"], mode=export_mode, templates=templates)
+        else:
+            await checkpoint.run("export", asyncio.to_thread, export_sheet_values, values, layout, club_sheet_id(cfg),
+                                 title, cfg["THRESHOLD"], mode=export_mode, templates=templates, checkpoint=checkpoint)
+    if changes is not None:
+        changes.mark_exported(title, digest)
+    PROFILER.event("club.exported", club=title, members=layout["n_data_rows"])
     return True
 
 # === Main ===
@@ -440,87 +619,386 @@ async def main():
     
     else:
         cfg = choice
-        print(f"\nSelected: {cfg['title']}\nURL: {cfg['URL']}\nSheet: {SHEET_ID}\nThreshold: {cfg['THRESHOLD']}\n")
+        print(f"\nSelected: {cfg['title']}\nURL: {cfg['URL']}\nSheet: {club_sheet_id(cfg)}\nThreshold: {cfg['THRESHOLD']}\n")
 
         await export_single_club_with_retry_v2(cfg, MAX_CLUB_RETRIES, CLUB_RETRY_DELAY)
 
 # === Main logic for single club with retry (for the single choice path) ===
-async def export_single_club_with_retry_v2(cfg: dict, max_retries: int, retry_delay: int):
+async def export_single_club_with_retry_v2(cfg: dict, max_retries: int, retry_delay: int,
+                                           fetcher: ClubFetcher | None = None, export_mode: str = EXPORT_MODE,
+                                           changes: ExportState | None = None,
+                                           local: tuple[str, ...] = (), sheets: bool = True,
+                                           templates: bool = SHEET_TEMPLATES,
+                                           sheets_client: AsyncSheetsClient | None = None):
     title = cfg['title']
-    for attempt in range(max_retries):
-        if attempt > 0:
-            print(f"\n⚡ Retrying full process for {title} (Attempt {attempt + 1}/{max_retries})...")
-            
-        try:
-            # Initial data is None to always trigger fetch_json inside
-            await process_and_export_club(cfg, data_or_task_result=None)
-            
-            if attempt == 0:
-                print(f"✅ Exported single club '{title}' successfully!")
-            else:
-                print(f"✅ Exported single club '{title}' successfully after {attempt} retry(ies)!")
-                
-            return True
-            
-        except Exception as e:
-            print(f"❌ Club '{title}' failed on attempt {attempt + 1}: {e}")
-            if attempt < max_retries - 1:
-                print(f"    Waiting {retry_delay}s before next retry...")
+    checkpoint = Checkpoint()
+
+    async def attempt(checkpoint: Checkpoint) -> bool:
+        return await process_and_export_club(cfg, fetcher=fetcher, export_mode=export_mode, changes=changes,
+                                             local=local, sheets=sheets, templates=templates, checkpoint=checkpoint,
+                                             sheets_client=sheets_client)
+
+    ok, exported = await retry_stages(title, attempt, max_retries, retry_delay, checkpoint)
+    if exported:
+        if checkpoint.retries == 0:
+            print(f"✅ Exported single club '{title}' successfully!")
+        else:
+            print(f"✅ Exported single club '{title}' successfully after {checkpoint.retries} retry(ies)!")
+    return ok
+
+# === ALL clubs in one batched Sheets export ===
+async def export_all_clubs_batched(fetcher: ClubFetcher, export_mode: str, max_retries: int, retry_delay: int,
+                                   changes: ExportState | None = None,
+                                   local: tuple[str, ...] = (), sheets: bool = True,
+                                   templates: bool = SHEET_TEMPLATES, summary: str | None = SUMMARY_SHEET):
+    print("\n⚡ Exporting ALL clubs: Pipelined fetch/build, then one batched Sheets update for every club...\n")
+
+    # 1. Each club is stored (or built) as soon as its own fetch finishes. Stored
+    # clubs live in one compact ClubStore and their frames are only built, one at
+    # a time, while the batch is assembled, so memory stays flat as CLUBS grows.
+    # With PROCESS_WORKERS, clubs are instead built in worker processes right away
+    # (more memory, all cores).
+    print("--- 1. Fetching and Building All Clubs Concurrently ---")
+    frames, digests, members, payloads, clubs_failed, clubs_unchanged = {}, {}, {}, {}, [], []
+    if FRAME_ENGINE == "numpy" and not COMPUTE.workers:
+        from club_store import ClubStore
+
+        store = ClubStore()
+    else:
+        store = None
+
+    async def build(data: dict, title: str):
+        if COMPUTE.workers:
+            frame = await prepare_in_process(data, title)
+            print(f"📥 {title} ready ({frame[1]['n_data_rows']} members).")
+        elif store is not None and await asyncio.to_thread(store.put, title, data):
+            frame = functools.partial(build_store_frame, store, title)
+            print(f"📥 {title} ready ({len(data['club_friend_history'])} history rows).")
+        else:
+            frame = await asyncio.to_thread(build_dataframe, data, title)
+            print(f"📥 {title} ready ({len(frame)} members).")
+        return frame
+
+    async def fetch_and_build(key: str, cfg: dict):
+        title = cfg["title"]
+
+        # A retry resumes at the failed stage: a build error does not fetch again
+        async def attempt(checkpoint: Checkpoint):
+            data = await checkpoint.run("fetch", fetcher.fetch, cfg["URL"])
+            if local:
+                await checkpoint.run("local", export_local_files, cfg, data, local)
+            if not sheets:
+                return
+            if changes is not None:
+                digests[key] = await checkpoint.run("check", asyncio.to_thread, history_digest, data,
+                                                    cfg["THRESHOLD"], club_sheet_id(cfg))
+                if changes.unchanged(title, digests[key]):
+                    changes.mark_checked(title)
+                    PROFILER.event("club.unchanged", club=title, members=member_count(data))
+                    print(f"⏭️ {title} unchanged since the last export, skipped.")
+                    clubs_unchanged.append(title)
+                    if summary:
+                        payloads[key] = data  # only its summary row is built, after the batch
+                    return
+            members[key] = member_count(data)
+            frames[key] = await checkpoint.run("build", build, data, title)
+
+        ok, _ = await retry_stages(title, attempt, max_retries, retry_delay)
+        if not ok:
+            clubs_failed.append(title)
+
+    await asyncio.gather(*(fetch_and_build(key, cfg) for key, cfg in CLUBS.items()))
+
+    # 2. One batched export per spreadsheet (clubs with their own SHEET_ID go to theirs), in CLUBS order
+    groups: dict[str, list[str]] = {}
+    for key, cfg in CLUBS.items():
+        if key in frames:
+            groups.setdefault(club_sheet_id(cfg), []).append(key)
+    # The summary is computed from the rows built for the batch, not from the sheets
+    collected = make_summary() if summary and groups else None
+    thresholds = {CLUBS[key]["title"]: CLUBS[key]["THRESHOLD"] for key in frames}
+    on_values = None if collected is None else \
+        lambda title, rows: collected.add(title, rows, thresholds[title])
+
+    async def export_batch(spreadsheet_id: str, keys: list[str]) -> bool:
+        from batch_export import export_clubs_batched
+
+        clubs = [(CLUBS[key]["title"], frames[key], CLUBS[key]["THRESHOLD"]) for key in keys]
+        # Unchanged and failed clubs are not rewritten but keep their place among the exported ones
+        order = [cfg["title"] for cfg in CLUBS.values() if club_sheet_id(cfg) == spreadsheet_id]
+        to = f" to {spreadsheet_id}" if len(groups) > 1 else ""
+        for attempt in range(max_retries):
+            if attempt > 0:
+                print(f"\n⚡ Retrying batched export{to} (Attempt {attempt + 1}/{max_retries}) "
+                      f"after waiting {retry_delay}s...")
                 await asyncio.sleep(retry_delay)
-            else:
-                print(f"    Final failure for {title} after {max_retries} attempts.")
-                return False
+            try:
+                async with LIMITS.slot("export"):
+                    calls = await asyncio.to_thread(export_clubs_batched, get_gc(), spreadsheet_id, clubs,
+                                                    mode=export_mode, templates=templates, on_values=on_values,
+                                                    order=order)
+                print(f"✅ {len(clubs)} club(s) exported{to} in {calls} Sheets API call(s).")
+                for key in keys:
+                    if changes is not None:
+                        changes.mark_exported(CLUBS[key]["title"], digests[key])
+                    PROFILER.event("club.exported", club=CLUBS[key]["title"], members=members[key])
+                return True
+            except SheetsPermanentError as e:
+                print(f"❌ Batched export{to} failed (not retrying): {e}")
+                PROFILER.event("export.failed", error=type(e).__name__)
+                break
+            except Exception as e:
+                print(f"❌ Batched export{to} failed on attempt {attempt + 1}: {e}")
+                PROFILER.event("export.retry", attempt=attempt + 1, error=type(e).__name__)
+        for title, _, _ in clubs:
+            clubs_failed.append(title)
+            PROFILER.event("club.failed", club=title, at="export")
+        return False
+
+    if groups:
+        print("\n--- 2. Exporting All Clubs in One Batch" + (f" per Spreadsheet ({len(groups)})" if len(groups) > 1 else "")
+              + " ---")
+    exported = all(await asyncio.gather(*(export_batch(sid, keys) for sid, keys in groups.items())))
+    if clubs_unchanged:
+        print(f"⏭️ {len(clubs_unchanged)} club(s) unchanged.")
+    if exported and collected is not None:
+        for key, data in payloads.items():
+            await asyncio.to_thread(add_payload_to_summary, collected, CLUBS[key], data)
+        await export_summary(collected, summary)
+
+    print("\n" + "="*50)
+    if clubs_failed:
+        print(f"⚠️ COMPLETED WITH ERRORS: {len(clubs_failed)} club(s) failed after {max_retries} attempts.")
+        print("    List of failed clubs: " + ", ".join(clubs_failed))
+    else:
+        print("🎉 COMPLETED: All clubs were exported successfully in order!")
+    print("="*50)
+
 
 # Updated main entry function for ALL/Single logic
-async def main_updated():
-    choice = pick_club()
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export Uma club fan history to Google Sheets.")
+    parser.add_argument("--fetch-mode", choices=["auto", "http", "browser"], default=FETCH_MODE,
+                        help="auto: direct API with browser fallback; http: direct API only; browser: browser only")
+    parser.add_argument("--api-url", default=CLUB_API_URL, help="club_profile API endpoint (e.g. a local stand-in server)")
+    parser.add_argument("--replay", action="store_true",
+                        help="build and export only from cached payloads, without fetching")
+    parser.add_argument("--no-cache", action="store_true", help="always fetch fresh payloads")
+    parser.add_argument("--no-block", action="store_true",
+                        help="let the browser load every page resource (compare with --profile)")
+    parser.add_argument("--export-mode", choices=["incremental", "recreate"], default=EXPORT_MODE,
+                        help="incremental: patch only changed cells; recreate: delete and rebuild each sheet")
+    parser.add_argument("--window-days", type=int, metavar="N",
+                        help="build each sheet from the last N days of the local history archive")
+    parser.add_argument("--profile", action="store_true",
+                        help="record per-stage timings to profiles/run-*.jsonl and print a summary")
+    parser.add_argument("--cprofile", metavar="STAGE",
+                        help="with --profile, also run cProfile on one stage (e.g. build_dataframe)")
+    parser.add_argument("--batch", action=argparse.BooleanOptionalAction, default=BATCH_EXPORT_ALL,
+                        help="export ALL clubs in one batched Sheets update instead of club by club")
+    parser.add_argument("--workers", type=int, default=PROCESS_WORKERS, metavar="N",
+                        help="build club frames and sheet values in N worker processes (0: threads)")
+    parser.add_argument("--club", metavar="KEY",
+                        help="export this club (a CLUBS key, or 0/all) without showing the menu")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and refresh every --interval seconds (all clubs unless --club)")
+    parser.add_argument("--interval", type=int, default=DAEMON_INTERVAL, metavar="SECONDS",
+                        help="seconds between refreshes in --daemon mode")
+    parser.add_argument("--force", action="store_true",
+                        help="export every club even if its history is unchanged since the last export")
+    parser.add_argument("--local", default=",".join(LOCAL_EXPORTS), metavar="FORMATS",
+                        help="also write each club to exports/ as " + ", ".join(LOCAL_FORMATS)
+                             + " (comma-separated)")
+    parser.add_argument("--sheets", action=argparse.BooleanOptionalAction, default=True,
+                        help="export to Google Sheets (--no-sheets: local files only)")
+    parser.add_argument("--templates", action=argparse.BooleanOptionalAction, default=SHEET_TEMPLATES,
+                        help="build new / rebuilt club sheets as copies of hidden pre-styled template sheets")
+    parser.add_argument("--summary", action=argparse.BooleanOptionalAction, default=bool(SUMMARY_SHEET),
+                        help="after exporting ALL clubs, write the cross-club summary sheet (SUMMARY_SHEET)")
+    parser.add_argument("--fetch-limit", type=int, default=FETCH_CONCURRENCY, metavar="N",
+                        help="at most N club fetches at a time (0: no limit)")
+    parser.add_argument("--export-limit", type=int, default=EXPORT_CONCURRENCY, metavar="N",
+                        help="at most N Sheets exports at a time (0: no limit)")
+    parser.add_argument("--adaptive", action=argparse.BooleanOptionalAction, default=ADAPTIVE_CONCURRENCY,
+                        help="move the fetch / export limits between 1 and N with latency, errors and memory / CPU")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, metavar="PORT",
+                        help="serve live Prometheus metrics on http://127.0.0.1:PORT/metrics while running")
+    parser.add_argument("--sheets-backend", choices=["gspread", "async"], default=SHEETS_BACKEND,
+                        help="per-club Sheets exports through gspread in threads, or a native asyncio client")
+
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    member = commands.add_parser("member", help="look up members in the history archive (no export)")
+    member.add_argument("queries", nargs="+", metavar="ID_OR_NAME",
+                        help="a friend_viewer_id, or a member name (any case; a prefix if no exact match)")
+    return parser.parse_args(argv)
+
+
+def local_formats(value: str) -> tuple[str, ...]:
+    formats = tuple(dict.fromkeys(f.strip().lower().lstrip(".") for f in value.split(",") if f.strip()))
+    unknown = [f for f in formats if f not in LOCAL_FORMATS]
+    if unknown:
+        raise SystemExit(f"Unknown --local format(s): {', '.join(unknown)} (choose from {', '.join(LOCAL_FORMATS)})")
+    for fmt in formats:
+        missing = missing_requirement(fmt)
+        if missing:
+            raise SystemExit(f"--local {fmt} needs {missing} (pip install {missing.split()[0]})")
+    return formats
+
+
+async def main_updated(args: argparse.Namespace | None = None):
+    args = args or parse_args([])
+    if args.club is not None:
+        choice = club_from_arg(args.club)
+    elif args.daemon:
+        choice = "ALL"
+    else:
+        choice = pick_club()
+
+    PROFILER.configure(args.profile, aliases={c["URL"]: c["title"] for c in CLUBS.values()},
+                       cprofile_stage=args.cprofile)
+    # Live counters / histograms for long-running (--daemon) processes, fed by the profiler spans
+    if args.metrics_port:
+        METRICS.start(args.metrics_port)
+        print(f"📈 Metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+
+    # Bounded pool for blocking pandas / gspread work (asyncio.to_thread uses it)
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=WORKER_THREADS))
     
     MAX_CLUB_RETRIES = 3
     CLUB_RETRY_DELAY = 5
-    
+
+    # Every Sheets call is paced to the per-minute quotas and retried on 429 / 5xx only
+    SHEETS.configure(SHEETS_READS_PER_MIN, SHEETS_WRITES_PER_MIN, SHEETS_BURST, SHEETS_MAX_RETRIES)
+    # Worker processes for frame / sheet-value building (0: build in the thread pool)
+    COMPUTE.configure(args.workers)
+    # Clubs fetched / exported at once, so a large CLUBS does not start everything together
+    LIMITS.configure({"fetch": args.fetch_limit, "export": args.export_limit}, adaptive=args.adaptive)
+    if args.adaptive and LIMITS.stages and resource_signal() is None:
+        print("⚠️ Adaptive concurrency has no memory / CPU signal on this machine (pip install psutil); "
+              "limits follow failures and timings only.")
+
+    # One browser pool for the whole run (start cost is paid once, not per club);
+    # the direct API client keeps its HTTP connections alive across clubs.
+    if args.replay and args.no_cache:
+        raise SystemExit("--replay needs the payload cache; drop --no-cache.")
+    # Local xlsx / csv / parquet files, written for every fetched club next to the Sheets export
+    local = local_formats(args.local)
+    if not local and not args.sheets:
+        raise SystemExit("--no-sheets needs --local FORMATS, or there is nothing to export.")
+    fetcher = ClubFetcher(
+        make_browser_pool(block=not args.no_block),
+        api=None if args.replay else make_api_client(args.fetch_mode, args.api_url),
+        cache=None if args.no_cache else make_payload_cache(),
+        replay=args.replay,
+        archive=make_history_archive() if ARCHIVE_ENABLED or args.window_days else None,
+        window_days=args.window_days,
+    )
+    # Clubs whose history hash matches their last export are neither rebuilt nor written
+    changes = make_export_state(force=args.force)
+    summary = (SUMMARY_SHEET or "Summary") if args.summary and args.sheets else None
+    # The batched ALL export and the summary stay on gspread (one call each, nothing to overlap)
+    sheets_client = make_sheets_client(args.sheets_backend) if args.sheets else None
+    try:
+        while True:
+            try:
+                if choice == "ALL" and args.batch:
+                    await export_all_clubs_batched(fetcher, args.export_mode, MAX_CLUB_RETRIES, CLUB_RETRY_DELAY,
+                                                   changes=changes, local=local, sheets=args.sheets,
+                                                   templates=args.templates, summary=summary)
+                else:
+                    await _run_choice(choice, fetcher, args.export_mode, MAX_CLUB_RETRIES, CLUB_RETRY_DELAY,
+                                      changes=changes, local=local, sheets=args.sheets,
+                                      templates=args.templates, summary=summary, sheets_client=sheets_client)
+            except Exception as e:
+                if not args.daemon:
+                    raise
+                print(f"❌ Refresh failed: {e}")
+            finally:
+                _write_profile()
+            if not args.daemon:
+                break
+            print(f"\n💤 Next refresh at {time.strftime('%H:%M:%S', time.localtime(time.time() + args.interval))} "
+                  f"(Ctrl+C to stop)...")
+            await asyncio.sleep(args.interval)
+    finally:
+        await fetcher.close()
+        if sheets_client is not None:
+            await sheets_client.close()
+        COMPUTE.close()
+        METRICS.stop()
+
+
+def _write_profile() -> None:
+    # One profile file per run (per refresh in daemon mode)
+    if not PROFILER.enabled or not PROFILER.records:
+        return
+    path = PROFILER.write_jsonl(resolve_base_dir() / PROFILE_DIR / time.strftime("run-%Y%m%d-%H%M%S.jsonl"))
+    print("\n" + PROFILER.summary())
+    print(f"📊 Run profile written to {path}")
+    PROFILER.reset()
+
+
+async def _run_choice(choice, fetcher: ClubFetcher, export_mode: str, MAX_CLUB_RETRIES: int, CLUB_RETRY_DELAY: int,
+                      changes: ExportState | None = None, local: tuple[str, ...] = (), sheets: bool = True,
+                      templates: bool = SHEET_TEMPLATES, summary: str | None = SUMMARY_SHEET,
+                      sheets_client: AsyncSheetsClient | None = None):
     if choice == "ALL":
         # Run ALL logic
-        print("\n⚡ Exporting ALL clubs: Concurrent data fetching, Sequential processing/Export with in-place retry to maintain order...\n")
-        
-        # 1. Concurrent data fetching
-        print("--- 1. Fetching All Data Concurrently ---")
-        fetch_tasks = {
-            key: asyncio.create_task(fetch_json(cfg["URL"])) 
-            for key, cfg in CLUBS.items()
-        }
-        
-        results = await asyncio.gather(*fetch_tasks.values(), return_exceptions=True)
-        results_map = {key: results[i] for i, key in enumerate(CLUBS.keys())}
-        
-        # 2. Sequential Processing and Export with In-Place Retry
-        print("\n--- 2. Processing and Exporting Sequentially with Retry ---")
-        clubs_failed = []
-        
-        for key, cfg in CLUBS.items():
+        print("\n⚡ Exporting ALL clubs: Pipelined fetch → build → export per club, sheet order restored at the end...\n")
+
+        collected = make_summary() if summary and sheets else None
+
+        async def run_club(cfg: dict) -> tuple[str, bool, bool]:
             title = cfg["title"]
-            initial_result = results_map[key]
-            
-            for attempt in range(MAX_CLUB_RETRIES):
-                if attempt > 0:
-                    print(f"\n⚡ Retrying club {title} (Attempt {attempt + 1}/{MAX_CLUB_RETRIES}) after waiting {CLUB_RETRY_DELAY}s...")
-                    await asyncio.sleep(CLUB_RETRY_DELAY)
-                
+            checkpoint = Checkpoint()
+
+            async def attempt(checkpoint: Checkpoint) -> bool:
+                return await process_and_export_club(cfg, fetcher=fetcher, export_mode=export_mode, changes=changes,
+                                                     local=local, sheets=sheets, templates=templates,
+                                                     checkpoint=checkpoint, sheets_client=sheets_client)
+
+            ok, exported = await retry_stages(title, attempt, MAX_CLUB_RETRIES, CLUB_RETRY_DELAY, checkpoint)
+            if exported:
+                if checkpoint.retries == 0:
+                    print(f"✅ {title} exported successfully.")
+                else:
+                    print(f"✅ {title} exported successfully after {checkpoint.retries} retry(ies).")
+            if ok and collected is not None:
+                # Rows built for the export, or the fetched payload of a club skipped as unchanged
+                if "build" in checkpoint:
+                    await asyncio.to_thread(collected.add, title, checkpoint.get("build"), cfg["THRESHOLD"])
+                else:
+                    await asyncio.to_thread(add_payload_to_summary, collected, cfg, checkpoint.get("fetch"))
+            return title, ok, bool(exported)
+
+        # Each club moves on to build/export as soon as its own fetch finishes
+        clubs_failed, clubs_exported = [], 0
+        for fut in asyncio.as_completed([run_club(cfg) for cfg in CLUBS.values()]):
+            title, ok, exported = await fut
+            if not ok:
+                clubs_failed.append(title)
+            clubs_exported += exported
+
+        # Sheets were (re)added in completion order; put them back in CLUBS order
+        if clubs_exported:
+            spreadsheets: dict[str, list[str]] = {}
+            for cfg in CLUBS.values():
+                spreadsheets.setdefault(club_sheet_id(cfg), []).append(cfg["title"])
+            for spreadsheet_id, titles in spreadsheets.items():
                 try:
-                    data_to_use = initial_result if attempt == 0 and not isinstance(initial_result, Exception) else None
-                    
-                    await process_and_export_club(cfg, data_or_task_result=data_to_use)
-                    
-                    if attempt == 0:
-                         print(f"✅ {title} exported successfully.")
+                    if sheets_client is not None:
+                        from sheets_async import order_club_sheets
+
+                        await order_club_sheets(sheets_client, spreadsheet_id, titles)
                     else:
-                         print(f"✅ {title} exported successfully after {attempt} retry(ies).")
-                    break
-                        
+                        from batch_export import order_club_sheets
+
+                        await asyncio.to_thread(order_club_sheets, get_gc(), spreadsheet_id, titles)
                 except Exception as e:
-                    print(f"❌ {title} failed on attempt {attempt + 1}: {e}")
-                    if attempt == MAX_CLUB_RETRIES - 1:
-                        clubs_failed.append(title)
-        
+                    print(f"⚠️ Could not restore sheet order in {spreadsheet_id}: {e}")
+            if collected is not None and len(collected):
+                await export_summary(collected, summary)
+
         print("\n" + "="*50)
         if clubs_failed:
             print(f"⚠️ COMPLETED WITH ERRORS: {len(clubs_failed)} club(s) failed after {MAX_CLUB_RETRIES} attempts.")
@@ -532,11 +1010,23 @@ async def main_updated():
     else:
         # Run Single club logic
         cfg = choice
-        print(f"\nSelected: {cfg['title']}\nURL: {cfg['URL']}\nSheet: {SHEET_ID}\nThreshold: {cfg['THRESHOLD']}\n")
+        print(f"\nSelected: {cfg['title']}\nURL: {cfg['URL']}\nSheet: {club_sheet_id(cfg)}\nThreshold: {cfg['THRESHOLD']}\n")
         
-        await export_single_club_with_retry_v2(cfg, MAX_CLUB_RETRIES, CLUB_RETRY_DELAY)
+        await export_single_club_with_retry_v2(cfg, MAX_CLUB_RETRIES, CLUB_RETRY_DELAY, fetcher=fetcher,
+                                               export_mode=export_mode, changes=changes,
+                                               local=local, sheets=sheets, templates=templates,
+                                               sheets_client=sheets_client)
 
 
 if __name__ == "__main__":
-    asyncio.run(main_updated())
-    input("Press Enter to close terminal...")
\ No newline at end of file
+    multiprocessing.freeze_support()  # worker processes in the PyInstaller build
+    args = parse_args()
+    if args.command == "member":
+        sys.exit(lookup_members(args.queries))
+    try:
+        asyncio.run(main_updated(args))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped.")
+    # Headless runs (scheduler / daemon) must not wait for a key press
+    if args.club is None and not args.daemon and sys.stdin.isatty():
+        input("Press Enter to close terminal...")
\ No newline at end of file
@@ -0,0 +1,162 @@
+import threading
+from bisect import bisect_left
+
+from profiling import PROFILER
+
+
+# === Live Prometheus metrics ===
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BUILD_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+BYTES_BUCKETS = (10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000)
+
+# name -> (type, help, histogram buckets)
+METRICS_HELP = {
+    "tracker_fetch_seconds": ("histogram", "club_profile fetch time over the network (cache hits excluded)", SECONDS_BUCKETS),
+    "tracker_fetch_payload_bytes": ("histogram", "club_profile response size", BYTES_BUCKETS),
+    "tracker_retries_total": ("counter", "Retried failures by retry loop and exception type", None),
+    "tracker_build_seconds": ("histogram", "Club frame / sheet value build time", BUILD_BUCKETS),
+    "tracker_sheets_calls_total": ("counter", "Google Sheets API calls (each attempt) by method", None),
+    "tracker_sheets_call_seconds": ("histogram", "Google Sheets API call latency by method", SECONDS_BUCKETS),
+    "tracker_club_exports_total": ("counter", "Club runs by result (exported, unchanged, failed)", None),
+    "tracker_club_last_success_timestamp_seconds": ("gauge", "Unix time the club's sheet was last confirmed "
+                                                             "up to date (exported, or unchanged)", None),
+    "tracker_club_members": ("gauge", "Members in the club's last fetched history", None),
+}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    """In-process counters, gauges and histograms, rendered in the Prometheus text format.
+
+    Fed by the profiler: `start` registers a PROFILER listener that turns the
+    spans and events the run already records (fetch, build, Sheets calls,
+    retries, club results) into metrics, and serves them on
+    http://host:port/metrics. Until then nothing is recorded and spans stay
+    no-ops, so a run without --metrics-port pays nothing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, tuple], float] = {}
+        self._hists: dict[tuple[str, tuple], list] = {}  # per-bucket counts (+Inf last), sum
+        self._server = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._server is not None
+
+    # --- Recording ---
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        buckets = METRICS_HELP[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = [[0] * (len(buckets) + 1), 0.0]
+            hist[0][bisect_left(buckets, value)] += 1
+            hist[1] += value
+
+    def record(self, rec: dict) -> None:
+        """PROFILER listener: one finished span or event."""
+        stage, club = rec["stage"], rec.get("club")
+        seconds = rec["duration_ms"] / 1000 if "duration_ms" in rec else None
+        if stage == "fetch":
+            self.observe("tracker_fetch_seconds", seconds, ok=str(rec["ok"]).lower())
+        elif stage in ("fetch.http", "fetch.response_body") and "bytes" in rec and rec.get("status", 200) == 200:
+            self.observe("tracker_fetch_payload_bytes", rec["bytes"],
+                         source="http" if stage == "fetch.http" else "browser")
+        elif stage.endswith(".retry") or stage == "sheets.backoff":
+            error = rec.get("error") or f"HTTP {rec.get('status')}"
+            self.inc("tracker_retries_total", loop=stage.split(".")[0], error=error)
+        elif stage in ("build_dataframe", "prepare_club"):
+            self.observe("tracker_build_seconds", seconds, engine=rec.get("engine"))
+        elif stage == "sheets.call":
+            self.inc("tracker_sheets_calls_total", method=rec["method"], ok=str(rec["ok"]).lower())
+            self.observe("tracker_sheets_call_seconds", seconds, method=rec["method"])
+        elif stage in ("club.exported", "club.unchanged", "club.failed"):
+            result = stage.split(".")[1]
+            self.inc("tracker_club_exports_total", club=club, result=result)
+            if result != "failed":
+                self.set("tracker_club_last_success_timestamp_seconds", rec["ts"], club=club)
+            if rec.get("members") is not None:
+                self.set("tracker_club_members", rec["members"], club=club)
+
+    # --- Output ---
+    def render(self) -> str:
+        with self._lock:
+            values = sorted(self._values.items())
+            hists = sorted((k, ([*counts], total)) for k, (counts, total) in self._hists.items())
+        lines = []
+        for name, (kind, text, buckets) in METRICS_HELP.items():
+            lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+            if kind != "histogram":
+                lines += [f"{name}{_labels(labels)} {value}" for (n, labels), value in values if n == name]
+                continue
+            for (n, labels), (counts, total) in hists:
+                if n != name:
+                    continue
+                cumulative = 0
+                for le, count in zip([*buckets, "+Inf"], counts):
+                    cumulative += count
+                    le = f'le="{le}"'
+                    lines.append(f"{name}_bucket{_labels(labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {total}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    # --- Endpoint ---
+    def start(self, port: int, host: str = "127.0.0.1") -> None:
+        """Serve /metrics from a daemon thread and start recording."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # scrapes would flood the console
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        PROFILER.add_listener(self.record)
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        PROFILER.remove_listener(self.record)
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+
+METRICS = Metrics()
@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+
+# === Raw payload cache ===
+class PayloadCache:
+    """Content-addressed on-disk cache of raw club_profile payloads.
+
+    Layout::
+
+        <root>/index.json                 club URL -> {hash, fetched_at, size}
+        <root>/objects/ab/abcdef....json.gz
+
+    Blobs are gzip-compressed and named by the SHA-256 of the payload, so an
+    unchanged payload is stored once. Lookups only read the index; entries older
+    than `ttl` seconds count as misses (unless `allow_stale`), and the oldest
+    entries are evicted once the blobs exceed `max_bytes`.
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, root: Path, ttl: float = 900, max_bytes: int = 200 * 1024 * 1024):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._index_path = self.root / self.INDEX_NAME
+        self._index: dict[str, dict] = self._load_index()
+
+    # --- Index ---
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._index_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=1, sort_keys=True)
+        os.replace(tmp, self._index_path)
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.json.gz"
+
+    # --- Public API ---
+    def get(self, url: str, allow_stale: bool = False) -> dict | None:
+        entry = self._index.get(url)
+        if entry is None:
+            return None
+        if not allow_stale and time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        try:
+            with gzip.open(self._blob_path(entry["hash"]), "rb") as f:
+                return json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError):
+            # Blob missing or corrupt: drop the entry so the next run re-fetches
+            self._index.pop(url, None)
+            self._save_index()
+            return None
+
+    def age(self, url: str) -> float | None:
+        entry = self._index.get(url)
+        return None if entry is None else time.time() - entry["fetched_at"]
+
+    def put(self, url: str, data: dict) -> str:
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(raw)
+            os.replace(tmp, path)
+
+        old = self._index.get(url)
+        self._index[url] = {"hash": digest, "fetched_at": time.time(), "size": path.stat().st_size}
+        if old is not None and old["hash"] != digest:
+            self._drop_blob(old["hash"])  # the URL's previous payload, unless another URL shares it
+        self._evict()
+        self._save_index()
+        return digest
+
+    # --- Eviction ---
+    def _evict(self) -> None:
+        # Blob sizes counted once per digest (several URLs may share one)
+        sizes = {e["hash"]: e["size"] for e in self._index.values()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        for url, entry in sorted(self._index.items(), key=lambda kv: kv[1]["fetched_at"]):
+            if total <= self.max_bytes:
+                break
+            del self._index[url]
+            if self._drop_blob(entry["hash"]):
+                total -= sizes[entry["hash"]]
+
+    def _drop_blob(self, digest: str) -> bool:
+        """Delete a blob no index entry refers to any more; False if one still does."""
+        if any(e["hash"] == digest for e in self._index.values()):
+            return False
+        try:
+            self._blob_path(digest).unlink()
+        except OSError:
+            pass
+        return True
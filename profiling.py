@@ -0,0 +1,182 @@
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from pathlib import Path
+
+
+# === Run instrumentation ===
+class _NullSpan:
+    """Returned when profiling is off: entering, tagging and leaving do nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setitem__(self, key, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("prof", "stage", "club", "fields", "t0", "wall", "cprof")
+
+    def __init__(self, prof: "RunProfiler", stage: str, club: str | None, fields: dict):
+        self.prof, self.stage, self.club, self.fields = prof, stage, club, fields
+        self.cprof = None
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.cprof = self.prof._start_cprofile(self.stage)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __setitem__(self, key, value):
+        self.fields[key] = value
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.t0
+        if self.cprof is not None:
+            self.prof._stop_cprofile(self.cprof)
+        rec = {"ts": round(self.wall, 3), "stage": self.stage, "club": self.prof.club_name(self.club),
+               "duration_ms": round(duration * 1000, 2), "ok": exc_type is None}
+        if exc_type is not None:
+            rec["error"] = exc_type.__name__
+        rec.update(self.fields)
+        self.prof._emit(rec)
+        return False
+
+
+class RunProfiler:
+    """Collects per-stage spans and events for one run.
+
+    Use `with PROFILER.span("stage", club=...) as sp: sp["bytes"] = n` around a
+    stage and `PROFILER.event(...)` for point events such as retries. While
+    disabled, `span` hands back a shared no-op object, so instrumented code pays
+    one attribute check per stage.
+
+    Listeners (`add_listener`) see every finished record even while disabled;
+    records are only kept for the run profile when enabled.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.records: list[dict] = []
+        self.aliases: dict[str, str] = {}  # e.g. club URL -> title
+        self.cprofile_stage: str | None = None
+        self.listeners: list = []
+        self._cprofile_lock = threading.Lock()
+        self._cprofile_busy = False
+        self._cprofile_stats: pstats.Stats | None = None
+
+    def configure(self, enabled: bool, aliases: dict[str, str] | None = None, cprofile_stage: str | None = None):
+        self.enabled = enabled
+        self.aliases = dict(aliases or {})
+        self.cprofile_stage = cprofile_stage if enabled else None
+
+    def reset(self):
+        self.records = []
+        self._cprofile_stats = None
+
+    def club_name(self, club: str | None) -> str | None:
+        return self.aliases.get(club, club)
+
+    def add_listener(self, fn) -> None:
+        """Call `fn(record)` for every span and event from now on (e.g. live metrics)."""
+        self.listeners.append(fn)
+
+    def remove_listener(self, fn) -> None:
+        self.listeners.remove(fn)
+
+    # --- Recording ---
+    def span(self, stage: str, club: str | None = None, **fields):
+        if not self.enabled and not self.listeners:
+            return _NULL_SPAN
+        return _Span(self, stage, club, fields)
+
+    def event(self, stage: str, club: str | None = None, **fields):
+        if not self.enabled and not self.listeners:
+            return
+        rec = {"ts": round(time.time(), 3), "stage": stage, "club": self.club_name(club)}
+        rec.update(fields)
+        self._emit(rec)
+
+    def _emit(self, rec: dict) -> None:
+        if self.enabled:
+            self.records.append(rec)
+        for fn in self.listeners:
+            fn(rec)
+
+    # --- cProfile hook (one stage, one span at a time) ---
+    def _start_cprofile(self, stage: str):
+        if stage != self.cprofile_stage:
+            return None
+        with self._cprofile_lock:
+            if self._cprofile_busy:
+                return None
+            self._cprofile_busy = True
+        cprof = cProfile.Profile()
+        cprof.enable()
+        return cprof
+
+    def _stop_cprofile(self, cprof: cProfile.Profile):
+        cprof.disable()
+        with self._cprofile_lock:
+            if self._cprofile_stats is None:
+                self._cprofile_stats = pstats.Stats(cprof)
+            else:
+                self._cprofile_stats.add(cprof)
+            self._cprofile_busy = False
+
+    # --- Output ---
+    def write_jsonl(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for rec in self.records:
+                f.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+        if self._cprofile_stats is not None:
+            self._cprofile_stats.dump_stats(path.with_suffix(".prof"))
+        return path
+
+    def summary(self) -> str:
+        spans = [r for r in self.records if "duration_ms" in r]
+        out = io.StringIO()
+
+        by_stage: dict[str, list[float]] = {}
+        for r in spans:
+            by_stage.setdefault(r["stage"], []).append(r["duration_ms"])
+        out.write(f"{'stage':<24} {'n':>4} {'total s':>9} {'p50 ms':>9} {'max ms':>9}\n")
+        for stage, durs in sorted(by_stage.items(), key=lambda kv: -sum(kv[1])):
+            durs = sorted(durs)
+            out.write(f"{stage:<24} {len(durs):>4} {sum(durs) / 1000:>9.2f} {durs[len(durs) // 2]:>9.1f} {durs[-1]:>9.1f}\n")
+
+        clubs: dict[str, dict] = {}
+        for r in self.records:
+            if not r.get("club"):
+                continue
+            c = clubs.setdefault(r["club"], {"failed": 0, "bytes": 0, "ms": 0.0})
+            if r["stage"].endswith(".retry"):  # logged for every failed attempt
+                c["failed"] += 1
+            c["bytes"] += r.get("bytes", 0) or 0
+            c["ms"] += r.get("duration_ms", 0.0)
+        if clubs:
+            out.write(f"\n{'club':<24} {'failed':>7} {'bytes':>11} {'time s':>8}\n")
+            for club, c in clubs.items():
+                out.write(f"{club[:24]:<24} {c['failed']:>7} {c['bytes']:>11,} {c['ms'] / 1000:>8.2f}\n")
+
+        if self._cprofile_stats is not None:
+            out.write(f"\ncProfile — {self.cprofile_stage}\n")
+            self._cprofile_stats.stream = out
+            self._cprofile_stats.sort_stats("cumulative").print_stats(15)
+        return out.getvalue()
+
+
+PROFILER = RunProfiler()
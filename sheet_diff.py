@@ -0,0 +1,156 @@
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+
+# === Incremental worksheet patching ===
+# Everything we need from the existing sheet in one spreadsheets.get call
+SHEET_META_FIELDS = (
+    "sheets(properties(sheetId,title,gridProperties),bandedRanges(bandedRangeId),"
+    "conditionalFormats(booleanRule(condition)),basicFilter(range),"
+    "data(startRow,startColumn,rowData(values(userEnteredValue))))"
+)
+
+DEFAULT_COLUMN_WIDTH = 100
+
+
+def fetch_sheet_states(ss, sheet_titles: list[str]) -> dict[str, dict]:
+    if not sheet_titles:
+        return {}
+    meta = ss.fetch_sheet_metadata(params={
+        "ranges": [absolute_range_name(t) for t in sheet_titles],
+        "includeGridData": "true",
+        "fields": SHEET_META_FIELDS,
+    })
+    return {sheet["properties"]["title"]: sheet for sheet in meta["sheets"]}
+
+
+def fetch_sheet_state(ss, sheet_title: str) -> dict:
+    return fetch_sheet_states(ss, [sheet_title])[sheet_title]
+
+
+def _norm(v):
+    # Sheets hands numbers back as int/float and blanks as missing cells
+    if v is None or v == "":
+        return ""
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, (int, float)):
+        f = float(v)
+        return "" if f != f else f
+    return str(v)
+
+
+def grid_values(sheet: dict) -> list[list]:
+    rows: list[list] = []
+    for block in sheet.get("data", []):
+        r0, c0 = block.get("startRow", 0), block.get("startColumn", 0)
+        for r, row in enumerate(block.get("rowData", []), start=r0):
+            while len(rows) <= r:
+                rows.append([])
+            vals = rows[r]
+            for c, cell in enumerate(row.get("values", []), start=c0):
+                uv = cell.get("userEnteredValue") or {}
+                while len(vals) <= c:
+                    vals.append("")
+                vals[c] = uv.get("numberValue", uv.get("stringValue", uv.get("boolValue", "")))
+
+    # Drop trailing blanks so the extents match what we wrote
+    for vals in rows:
+        while vals and _norm(vals[-1]) == "":
+            vals.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+def applied_threshold(sheet: dict) -> str | None:
+    for rule in sheet.get("conditionalFormats", []):
+        cond = rule.get("booleanRule", {}).get("condition", {})
+        if cond.get("type") == "NUMBER_LESS":
+            vals = cond.get("values") or [{}]
+            return vals[0].get("userEnteredValue")
+    return None
+
+
+def layout_unchanged(sheet: dict, old_values: list[list], new_values: list[list], threshold: int) -> bool:
+    """Formatting only depends on the table extents and the threshold, not on cell text."""
+    old_cols = len(old_values[0]) if old_values else 0
+    return (
+        len(old_values) == len(new_values)
+        and old_cols == len(new_values[0])
+        and applied_threshold(sheet) == str(threshold)
+    )
+
+
+def changed_spans(old_values: list[list], new_values: list[list]) -> list[tuple[int, int, int]]:
+    """(row, first_col, last_col) 0-based, one span per row covering all its changed cells."""
+    spans = []
+    for r, new_row in enumerate(new_values):
+        old_row = old_values[r] if r < len(old_values) else []
+        changed = [
+            c for c, v in enumerate(new_row)
+            if _norm(v) != _norm(old_row[c] if c < len(old_row) else "")
+        ]
+        if changed:
+            spans.append((r, changed[0], changed[-1]))
+    return spans
+
+
+def diff_ranges(old_values: list[list], new_values: list[list]) -> list[dict]:
+    """values.batchUpdate payload covering every changed cell."""
+    return [
+        {
+            "range": f"{rowcol_to_a1(r + 1, lo + 1)}:{rowcol_to_a1(r + 1, hi + 1)}",
+            "values": [new_values[r][lo:hi + 1]],
+        }
+        for r, lo, hi in changed_spans(old_values, new_values)
+    ]
+
+
+def padded_values(old_values: list[list], new_values: list[list]) -> list[list]:
+    """New values padded with blanks so leftovers from a larger old table are cleared."""
+    n_rows = max(len(old_values), len(new_values))
+    n_cols = max([len(r) for r in old_values] + [len(new_values[0])])
+    out = []
+    for r in range(n_rows):
+        row = list(new_values[r]) if r < len(new_values) else []
+        out.append(row + [""] * (n_cols - len(row)))
+    return out
+
+
+def reset_format_requests(sheet: dict) -> list[dict]:
+    """Strip banding, conditional rules, filter, cell formats and widths before re-styling."""
+    props = sheet["properties"]
+    sheet_id = props["sheetId"]
+    n_cols = props.get("gridProperties", {}).get("columnCount", 26)
+
+    requests = [{"deleteBanding": {"bandedRangeId": b["bandedRangeId"]}} for b in sheet.get("bandedRanges", [])]
+    requests += [
+        {"deleteConditionalFormatRule": {"sheetId": sheet_id, "index": i}}
+        for i in reversed(range(len(sheet.get("conditionalFormats", []))))
+    ]
+    if "basicFilter" in sheet:
+        requests.append({"clearBasicFilter": {"sheetId": sheet_id}})
+    requests += [
+        {"repeatCell": {"range": {"sheetId": sheet_id}, "cell": {}, "fields": "userEnteredFormat"}},
+        {"updateDimensionProperties": {
+            "range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": 0, "endIndex": n_cols},
+            "properties": {"pixelSize": DEFAULT_COLUMN_WIDTH},
+            "fields": "pixelSize",
+        }},
+    ]
+    return requests
+
+
+def grow_grid_request(sheet: dict, n_rows: int, n_cols: int) -> dict | None:
+    props = sheet["properties"]
+    grid = props.get("gridProperties", {})
+    rows, cols = grid.get("rowCount", 0), grid.get("columnCount", 0)
+    if rows >= n_rows and cols >= n_cols:
+        return None
+    return {
+        "updateSheetProperties": {
+            "properties": {"sheetId": props["sheetId"], "gridProperties": {
+                "rowCount": max(rows, n_rows), "columnCount": max(cols, n_cols)}},
+            "fields": "gridProperties(rowCount,columnCount)",
+        }
+    }
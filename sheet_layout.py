@@ -0,0 +1,222 @@
+import pandas as pd
+
+
+# === Sheet layout (pure: no Sheets API calls) ===
+GAP_COL = " "
+
+
+def _blank_missing(col: pd.Series) -> list:
+    # Python scalars, with "" for missing cells
+    missing = col.isna().to_numpy()
+    if not missing.any():
+        return col.tolist()
+    return ["" if m else v for v, m in zip(col.tolist(), missing)]
+
+
+def build_sheet_values(df: pd.DataFrame) -> tuple[list[list], dict]:
+    """Rows to write (header, members, Total, Day AVG) plus the layout the formatting needs."""
+    dcols = [c for c in df.columns if isinstance(c, str) and c.startswith("Day ")]
+
+    # The frame is read column by column, never copied: Total and a blue gap
+    # column before it are extra columns of the output only
+    columns = {c: df[c] for c in df.columns}
+    if dcols:
+        gidx = len(columns)
+        columns[GAP_COL] = None
+        columns["Total"] = df[dcols].sum(axis=1, min_count=1)
+    else:
+        gidx = None
+
+    # Bottom "Total" row (sum)
+    bottom_totals = {}
+    for c, col in columns.items():
+        if c == "Member_Name":
+            bottom_totals[c] = "Total"
+        elif c in ("Member_ID", GAP_COL):
+            bottom_totals[c] = ""
+        else:
+            bottom_totals[c] = pd.to_numeric(col, errors="coerce").sum(min_count=1)
+
+    # Day AVG row — per-day means only (no AVG/d)
+    day_avgs = dict.fromkeys(columns, "")
+    if dcols:
+        means = df[dcols].mean(axis=0, skipna=True).round(0)
+        for c in dcols:
+            day_avgs[c] = means.get(c, "")
+    day_avgs["Member_Name"] = "Day AVG"
+
+    header = list(map(str, columns))
+    cells = [[""] * len(df) if col is None else _blank_missing(col) for col in columns.values()]
+    data_rows = [list(row) for row in zip(*cells)]
+    totals_row = [("" if pd.isna(v) else v) for v in bottom_totals.values()]
+    day_avg_row = list(day_avgs.values())
+
+    # Values order: header, data..., Total, Day AVG
+    values = [header] + data_rows + [totals_row, day_avg_row]
+
+
+    layout = {"header": header, "dcols": dcols, "gidx": gidx, "n_data_rows": len(data_rows)}
+    return values, layout
+
+
+def _col_range_rows(sheet_id: int, start_row_1: int, end_row_1: int, col_1: int) -> dict:
+    return {"sheetId": sheet_id, "startRowIndex": start_row_1 - 1, "endRowIndex": end_row_1,
+            "startColumnIndex": col_1 - 1, "endColumnIndex": col_1}
+
+
+def _day_ranges(sheet_id: int, layout: dict) -> list[dict]:
+    # Day N columns, data rows only
+    header, last_data_row_1based = layout["header"], 1 + layout["n_data_rows"]
+    return [_col_range_rows(sheet_id, 2, last_data_row_1based, header.index(c) + 1)
+            for c in layout["dcols"] if c in header]
+
+
+def threshold_rule(sheet_id: int, layout: dict, threshold: int) -> dict | None:
+    """Conditional red (below threshold) rule — Day N columns + AVG/d, data rows only."""
+    ranges = _day_ranges(sheet_id, layout)
+    if "AVG/d" in layout["header"]:
+        ranges.append(_col_range_rows(sheet_id, 2, 1 + layout["n_data_rows"], layout["header"].index("AVG/d") + 1))
+    if not ranges:
+        return None
+    red_fill = {"red": 1.00, "green": 0.78, "blue": 0.81}
+    return {"ranges": ranges,
+            "booleanRule": {"condition": {"type": "NUMBER_LESS", "values": [{"userEnteredValue": str(threshold)}]},
+                            "format": {"backgroundColor": red_fill}}}
+
+
+def build_format_requests(sheet_id: int, layout: dict, threshold: int) -> list[dict]:
+    """batchUpdate requests that style a freshly written sheet of the given layout."""
+    header, gidx = layout["header"], layout["gidx"]
+    end_row = layout["n_data_rows"] + 3  # header + data + Total + Day AVG
+    end_col = len(header)
+    last_data_row_1based = 1 + layout["n_data_rows"]  # header + data (excludes the 2 summary rows)
+
+    header_range = {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": 1, "startColumnIndex": 0, "endColumnIndex": end_col}
+    totals_range = {"sheetId": sheet_id, "startRowIndex": end_row - 2, "endRowIndex": end_row, "startColumnIndex": 0, "endColumnIndex": end_col}
+    header_plus_data_range = {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": last_data_row_1based, "startColumnIndex": 0, "endColumnIndex": end_col}
+    band_left = {"sheetId": sheet_id, "startRowIndex": 1, "endRowIndex": last_data_row_1based, "startColumnIndex": 0, "endColumnIndex": (gidx if gidx is not None else end_col)}
+    band_right = {"sheetId": sheet_id, "startRowIndex": 1, "endRowIndex": last_data_row_1based,
+                  "startColumnIndex": (gidx + 1 if gidx is not None else end_col), "endColumnIndex": end_col}
+    full_table_range = {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": end_row, "startColumnIndex": 0, "endColumnIndex": end_col}
+
+    # Number formatting applies to all numeric columns except id/name/gap
+    skip_for_number = {"Member_ID", "Member_Name", GAP_COL}
+    numeric_cols_1 = [i + 1 for i, c in enumerate(header) if c not in skip_for_number]
+
+    numeric_ranges_all = [_col_range_rows(sheet_id, 2, end_row, c1) for c1 in numeric_cols_1]
+    # Conditional threshold: Day columns + AVG/d (data rows only)
+    numeric_ranges_data_days = _day_ranges(sheet_id, layout)
+    red_rule = threshold_rule(sheet_id, layout, threshold)
+
+    blue_fill  = {"red": 0.31, "green": 0.51, "blue": 0.74}
+    white_font = {"red": 1, "green": 1, "blue": 1}
+    grey_fill  = {"red": 0.75, "green": 0.75, "blue": 0.75}
+    band_light = {"red": 0.86, "green": 0.92, "blue": 0.97}
+    band_very  = {"red": 0.95, "green": 0.97, "blue": 0.98}
+    number_format = {"type": "NUMBER", "pattern": "#,##0"}
+
+    requests = [
+        {"setBasicFilter": {"filter": {"range": header_plus_data_range}}},
+
+        # Header styling
+        {
+            "repeatCell": {
+                "range": header_range,
+                "cell": {"userEnteredFormat": {
+                    "backgroundColor": blue_fill,
+                    "textFormat": {"bold": True, "foregroundColor": white_font},
+                    "horizontalAlignment": "CENTER",
+                    "verticalAlignment": "MIDDLE"
+                }},
+                "fields": "userEnteredFormat(backgroundColor,textFormat,horizontalAlignment,verticalAlignment)"
+            }
+        },
+
+        # Style both "Total" and "Day AVG" rows
+        {
+            "repeatCell": {
+                "range": totals_range,
+                "cell": {"userEnteredFormat": {"backgroundColor": blue_fill, "textFormat": {"bold": True, "foregroundColor": white_font}}},
+                "fields": "userEnteredFormat(backgroundColor,textFormat)"
+            }
+        },
+
+        # GAP column blue & narrow
+        *([
+            {
+                "repeatCell": {
+                    "range": {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": end_row, "startColumnIndex": gidx, "endColumnIndex": gidx + 1},
+                    "cell": {"userEnteredFormat": {"backgroundColor": blue_fill}},
+                    "fields": "userEnteredFormat.backgroundColor"
+                }
+            },
+            {
+                "updateDimensionProperties": {
+                    "range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": gidx, "endIndex": gidx + 1},
+                    "properties": {"pixelSize": 40},
+                    "fields": "pixelSize"
+                }
+            }
+        ] if gidx is not None else []),
+
+        # Alternating banded rows (data only)
+        *([
+            {"addBanding": {"bandedRange": {"range": band_left,  "rowProperties": {"firstBandColor": band_light, "secondBandColor": band_very}}}}
+        ] if gidx is None or gidx > 0 else []),
+        *([
+            {"addBanding": {"bandedRange": {"range": band_right, "rowProperties": {"firstBandColor": band_light, "secondBandColor": band_very}}}}
+        ] if gidx is not None and gidx + 1 < end_col else []),
+
+        # Number formatting for all numeric columns (AVG/d, Day N, Total)
+        *[
+            {"repeatCell": {"range": r, "cell": {"userEnteredFormat": {"numberFormat": number_format}}, "fields": "userEnteredFormat.numberFormat"}}
+            for r in numeric_ranges_all
+        ],
+
+        # Conditional red (below threshold) — Day N columns + AVG/d, data rows only
+        *([{"addConditionalFormatRule": {"rule": red_rule, "index": 0}}] if red_rule is not None else []),
+
+        # Conditional grey (blanks) — ONLY for Day N columns, data rows
+        *([{
+            "addConditionalFormatRule": {
+                "rule": {"ranges": numeric_ranges_data_days,
+                         "booleanRule": {"condition": {"type": "BLANK"},
+                                         "format": {"backgroundColor": grey_fill}}},
+                "index": 0
+            }
+        }] if numeric_ranges_data_days else []),
+
+        # Borders on all cells
+        {
+            "updateBorders": {
+                "range": full_table_range,
+                "top": {"style": "SOLID"},
+                "bottom": {"style": "SOLID"},
+                "left": {"style": "SOLID"},
+                "right": {"style": "SOLID"},
+                "innerHorizontal": {"style": "SOLID"},
+                "innerVertical": {"style": "SOLID"},
+            }
+        },
+    ]
+
+    # Wider Member_Name (for filter icon space)
+    if "Member_Name" in header:
+        name_col_index = header.index("Member_Name")
+        requests.append({
+            "updateDimensionProperties": {
+                "range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": name_col_index, "endIndex": name_col_index + 1},
+                "properties": {"pixelSize": 140},
+                "fields": "pixelSize"
+            }
+        })
+
+    # Freeze header
+    requests.append({
+        "updateSheetProperties": {
+            "properties": {"sheetId": sheet_id, "gridProperties": {"frozenRowCount": 1}},
+            "fields": "gridProperties.frozenRowCount"
+        }
+    })
+
+    return requests
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import random
+
+from sheet_layout import build_format_requests, threshold_rule
+
+
+# === Pre-styled template sheets ===
+# A club sheet is a copy of a hidden template styled for its column layout, so
+# building it takes a handful of requests instead of the full formatting set.
+TEMPLATE_PREFIX = "_template "
+TEMPLATE_DATA_ROWS = 2  # clones grow / shrink from here; rows inserted inside a range extend its styling
+THRESHOLD_RULE_INDEX = 1  # build_format_requests puts the grey rule at 0, in front of the red one
+
+
+def new_sheet_id(used_ids: set[int]) -> int:
+    sheet_id = random.randrange(1, 2**31 - 1)
+    while sheet_id in used_ids:
+        sheet_id = random.randrange(1, 2**31 - 1)
+    used_ids.add(sheet_id)
+    return sheet_id
+
+
+def usable(layout: dict) -> bool:
+    # Without day columns or members there are no data rows to grow the template's styling from
+    return bool(layout["dcols"]) and layout["n_data_rows"] > 0
+
+
+def _template_layout(layout: dict) -> dict:
+    names = {c: f"Day {i}" for i, c in enumerate(layout["dcols"], start=1)}
+    return {"header": [names.get(c, c) for c in layout["header"]], "dcols": list(names.values()),
+            "gidx": layout["gidx"], "n_data_rows": TEMPLATE_DATA_ROWS}
+
+
+def template_title(layout: dict) -> str:
+    """One template per column layout; the hash of its styling makes a style change a new template."""
+    tl = _template_layout(layout)
+    style = json.dumps([tl["header"], build_format_requests(0, tl, 0)], sort_keys=True)
+    return f"{TEMPLATE_PREFIX}{len(tl['dcols'])} days ({hashlib.sha1(style.encode('utf-8')).hexdigest()[:8]})"
+
+
+class TemplateSheets:
+    """Clones club sheets from the template sheets of one spreadsheet, creating templates as needed.
+
+    `sheets` maps title -> sheet properties (sheetId, index) as they are before
+    the batch; `clone` returns requests that assume everything it returned
+    earlier was applied first, in order. Templates are added (hidden, in front)
+    when a layout has none yet; a template of the same day count with older styling is
+    deleted by `cleanup_requests`, which goes last in the batch.
+    """
+
+    def __init__(self, sheets: dict[str, dict], used_ids: set[int]):
+        self.sheets = {title: dict(props) for title, props in sheets.items()}
+        self.used_ids = used_ids
+        self.n_sheets = len(sheets)
+        self._stale: dict[str, int] = {}
+
+    def _template_id(self, layout: dict, requests: list[dict]) -> int:
+        title = template_title(layout)
+        if title in self.sheets:
+            return self.sheets[title]["sheetId"]
+
+        older = title.split(" (")[0] + " ("
+        self._stale.update({t: p["sheetId"] for t, p in self.sheets.items() if t.startswith(older)})
+        tl = _template_layout(layout)
+        sheet_id = new_sheet_id(self.used_ids)
+        # First in the spreadsheet, so it never lands between (and reorders) the club sheets
+        requests.append({"addSheet": {"properties": {
+            "sheetId": sheet_id, "title": title, "index": 0, "hidden": True,
+            "gridProperties": {"rowCount": TEMPLATE_DATA_ROWS + 3 + 50, "columnCount": len(tl["header"]) + 10},
+        }}})
+        requests += build_format_requests(sheet_id, tl, 0)
+        for props in self.sheets.values():
+            props["index"] += 1
+        self.sheets[title] = {"sheetId": sheet_id, "title": title, "index": 0}
+        self.n_sheets += 1
+        return sheet_id
+
+    def clone(self, title: str, layout: dict, threshold: int) -> tuple[int, list[dict]]:
+        """(sheet id, requests) that add club sheet `title` — or replace it in place — as a
+        styled copy of its template, sized for `layout`. The values are the caller's to write."""
+        requests: list[dict] = []
+        template_id = self._template_id(layout, requests)
+
+        old = self.sheets.get(title)
+        if old is not None:
+            index = old["index"]
+        else:
+            index = self.n_sheets
+            self.n_sheets += 1
+        sheet_id = new_sheet_id(self.used_ids)
+        self.sheets[title] = {"sheetId": sheet_id, "title": title, "index": index}
+
+        # A copy replacing a sheet is made (and shown) under a temporary title before the old
+        # one goes: the old sheet may be the only visible one, which the API won't delete
+        requests += [
+            {"duplicateSheet": {"sourceSheetId": template_id, "newSheetId": sheet_id,
+                                "newSheetName": title if old is None else f"_copy {sheet_id}",
+                                "insertSheetIndex": index}},
+            {"updateSheetProperties": {"properties": {"sheetId": sheet_id, "hidden": False}, "fields": "hidden"}},
+        ]
+        if old is not None:
+            requests += [
+                {"deleteSheet": {"sheetId": old["sheetId"]}},
+                {"updateSheetProperties": {"properties": {"sheetId": sheet_id, "title": title}, "fields": "title"}},
+            ]
+        n = layout["n_data_rows"]
+        if n > TEMPLATE_DATA_ROWS:
+            # Between the template's data rows, so banding, rules, filter, borders and formats all stretch
+            requests.append({"insertDimension": {
+                "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": 2, "endIndex": 2 + n - TEMPLATE_DATA_ROWS},
+                "inheritFromBefore": True,
+            }})
+        elif n < TEMPLATE_DATA_ROWS:
+            requests.append({"deleteDimension": {
+                "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": 1 + n, "endIndex": 1 + TEMPLATE_DATA_ROWS},
+            }})
+        requests.append({"updateConditionalFormatRule": {
+            "sheetId": sheet_id, "index": THRESHOLD_RULE_INDEX, "rule": threshold_rule(sheet_id, layout, threshold),
+        }})
+        return sheet_id, requests
+
+    def appended(self, title: str, sheet_id: int) -> None:
+        """Record a sheet the caller appends itself (e.g. with addSheet) in the same batch."""
+        self.sheets[title] = {"sheetId": sheet_id, "title": title, "index": self.n_sheets}
+        self.n_sheets += 1
+
+    def cleanup_requests(self) -> list[dict]:
+        requests = [{"deleteSheet": {"sheetId": sheet_id}} for sheet_id in self._stale.values()]
+        for title in self._stale:
+            self.sheets.pop(title, None)
+        self._stale = {}
+        return requests
@@ -0,0 +1,182 @@
+import asyncio
+from urllib.parse import quote
+
+from profiling import PROFILER
+from sheets_scheduler import SHEETS, SheetsHTTPError
+
+
+# === Native async Sheets backend ===
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+SHEET_LIST_FIELDS = "sheets.properties(sheetId,title,index,hidden)"
+
+
+class AsyncSheetsClient:
+    """The Sheets REST calls the exports need, on one pooled keep-alive httpx client.
+
+    Authenticates with the service-account `credentials` (refreshed in a worker
+    thread whenever the token is missing or about to expire). The raw calls
+    (`get_spreadsheet`, `batch_update`) are not paced; go through SHEETS.acall
+    as the gspread calls go through SHEETS.call. Each spreadsheet's sheet list
+    (id, title, index, hidden) is fetched once by `sheets` and then kept current
+    from this client's own batchUpdates, so exporting a club does not re-list
+    the worksheets.
+    """
+
+    def __init__(self, credentials, api_url: str = SHEETS_API_URL, timeout: float = 60, max_connections: int = 10):
+        import httpx  # loaded with the first client, not at start-up
+
+        self.credentials = credentials
+        self.api_url = api_url.rstrip("/")
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._token_lock = asyncio.Lock()
+        self._sheets: dict[str, list[dict]] = {}
+        self._used_ids: dict[str, set[int]] = {}
+        self._list_locks: dict[str, asyncio.Lock] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def _token(self) -> str:
+        async with self._token_lock:
+            if not self.credentials.valid:
+                from google.auth.transport.requests import Request
+
+                with PROFILER.span("sheets.token_refresh"):
+                    await asyncio.to_thread(self.credentials.refresh, Request())
+            return self.credentials.token
+
+    async def _request(self, method: str, path: str, params: dict | None = None, body: dict | None = None) -> dict:
+        headers = {"Authorization": f"Bearer {await self._token()}"}
+        resp = await self._client.request(method, f"{self.api_url}/{path}", params=params, json=body, headers=headers)
+        if resp.status_code >= 400:
+            try:
+                message = resp.json()["error"]["message"]
+            except (ValueError, KeyError, TypeError):
+                message = resp.text[:200]
+            raise SheetsHTTPError(resp.status_code, message, resp.headers.get("Retry-After"))
+        return resp.json() if resp.content else {}
+
+    # --- Raw API calls ---
+    async def get_spreadsheet(self, spreadsheet_id: str, params: dict | None = None) -> dict:
+        """spreadsheets.get; `params` as for gspread's fetch_sheet_metadata (fields, ranges, includeGridData)."""
+        return await self._request("GET", quote(spreadsheet_id), params=params)
+
+    async def batch_update(self, spreadsheet_id: str, body: dict) -> dict:
+        """spreadsheets.batchUpdate; the cached sheet list follows the sheets it adds, removes or moves."""
+        try:
+            reply = await self._request("POST", f"{quote(spreadsheet_id)}:batchUpdate", body=body)
+        except Exception:
+            # The batch may have been applied without an answer (e.g. a dropped connection): list again
+            self._sheets.pop(spreadsheet_id, None)
+            raise
+        if spreadsheet_id in self._sheets:
+            self._apply(spreadsheet_id, body["requests"], reply.get("replies") or [])
+        return reply
+
+    # --- Cached sheet list ---
+    def lock(self, spreadsheet_id: str) -> asyncio.Lock:
+        """Serializes the batches of one spreadsheet that must see each other's sheets (e.g. template copies)."""
+        return self._locks.setdefault(spreadsheet_id, asyncio.Lock())
+
+    def used_ids(self, spreadsheet_id: str) -> set[int]:
+        """Sheet ids taken (or handed out for a pending batch) in a spreadsheet listed with `sheets`."""
+        return self._used_ids[spreadsheet_id]
+
+    async def sheets(self, spreadsheet_id: str, refresh: bool = False) -> dict[str, dict]:
+        """title -> properties (sheetId, title, index, hidden), listed once per spreadsheet unless `refresh`."""
+        async with self._list_locks.setdefault(spreadsheet_id, asyncio.Lock()):
+            if refresh or spreadsheet_id not in self._sheets:
+                with PROFILER.span("sheets.list"):
+                    meta = await SHEETS.acall("read", self.get_spreadsheet, spreadsheet_id,
+                                              {"fields": SHEET_LIST_FIELDS})
+                self._sheets[spreadsheet_id] = sorted((s["properties"] for s in meta.get("sheets", [])),
+                                                      key=lambda p: p["index"])
+                self._used_ids.setdefault(spreadsheet_id, set()).update(p["sheetId"] for p in self._sheets[spreadsheet_id])
+        return {p["title"]: dict(p) for p in self._sheets[spreadsheet_id]}
+
+    def _apply(self, spreadsheet_id: str, requests: list[dict], replies: list[dict]) -> None:
+        sheets = self._sheets[spreadsheet_id]
+        for request, reply in zip(requests, replies + [{}] * (len(requests) - len(replies))):
+            (kind, value), = request.items()
+            if kind in ("addSheet", "duplicateSheet"):
+                props = (reply.get(kind) or {}).get("properties")
+                if props is None:
+                    continue
+                props = {k: props[k] for k in ("sheetId", "title", "index", "hidden") if k in props}
+                sheets.insert(min(props.get("index", len(sheets)), len(sheets)), props)
+                self._used_ids[spreadsheet_id].add(props["sheetId"])
+            elif kind == "deleteSheet":
+                sheets[:] = [p for p in sheets if p["sheetId"] != value["sheetId"]]
+            elif kind == "updateSheetProperties":
+                changed = value["properties"]
+                props = next((p for p in sheets if p["sheetId"] == changed.get("sheetId")), None)
+                if props is None:
+                    continue
+                if "hidden" in changed:
+                    props["hidden"] = changed["hidden"]
+                if "title" in changed:
+                    props["title"] = changed["title"]
+                if "index" in changed:
+                    sheets.remove(props)
+                    sheets.insert(min(changed["index"], len(sheets)), props)
+            for i, props in enumerate(sheets):
+                props["index"] = i
+
+
+async def export_club_sheet(client: AsyncSheetsClient, spreadsheet_id: str, title: str, values: list[list],
+                            layout: dict, threshold: int, mode: str = "incremental", templates: bool = False) -> int:
+    """Bring one club sheet up to date in a single batchUpdate; returns the Sheets calls made.
+
+    Like export_sheet_values, but the sheet list comes from the client's cache
+    and values and formatting go in one request list built by
+    batch_export.club_sheet_requests. An existing sheet is read once for its
+    current state. Different clubs and different spreadsheets export
+    concurrently; template copies of one spreadsheet take turns.
+    """
+    import sheet_diff
+    from batch_export import club_sheet_requests
+    from sheet_templates import TemplateSheets, usable
+
+    existing = await client.sheets(spreadsheet_id)
+    calls = 0
+    state = None
+    if title in existing:
+        with PROFILER.span("sheets.read", club=title):
+            meta = await SHEETS.acall("read", client.get_spreadsheet, spreadsheet_id, {
+                "ranges": [sheet_diff.absolute_range_name(title)],
+                "includeGridData": "true",
+                "fields": sheet_diff.SHEET_META_FIELDS,
+            })
+        state = meta["sheets"][0]
+        calls += 1
+
+    async def send(cloner: TemplateSheets | None = None) -> int:
+        _, requests = club_sheet_requests(title, values, layout, threshold, state, client.used_ids(spreadsheet_id),
+                                          cloner=cloner, mode=mode)
+        if cloner is not None:
+            requests += cloner.cleanup_requests()
+        if not requests:
+            return 0
+        with PROFILER.span("sheets.batch_update", club=title, requests=len(requests)):
+            await SHEETS.acall("write", client.batch_update, spreadsheet_id, {"requests": requests})
+        return 1
+
+    if templates and usable(layout):
+        async with client.lock(spreadsheet_id):
+            # Re-read the cache inside the lock: an earlier club may have added the template
+            return calls + await send(TemplateSheets(await client.sheets(spreadsheet_id), client.used_ids(spreadsheet_id)))
+    return calls + await send()
+
+
+async def order_club_sheets(client: AsyncSheetsClient, spreadsheet_id: str, titles: list[str]) -> None:
+    """batch_export.order_club_sheets on the async backend (the sheet list is listed again first)."""
+    from batch_export import sheet_order_requests
+
+    existing = await client.sheets(spreadsheet_id, refresh=True)
+    requests = sheet_order_requests(existing, titles, {})
+    if requests:
+        await SHEETS.acall("write", client.batch_update, spreadsheet_id, {"requests": requests})
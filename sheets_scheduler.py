@@ -0,0 +1,175 @@
+import asyncio
+import random
+import threading
+import time
+
+from profiling import PROFILER
+
+
+# === Quota-aware Sheets API scheduler ===
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class SheetsPermanentError(Exception):
+    """A Sheets call failed in a way retrying cannot fix (permission denied, bad request, not found)."""
+
+
+class SheetsHTTPError(Exception):
+    """An error answer from the Sheets REST API, as raised by the async backend (sheets_async)."""
+
+    def __init__(self, status: int, message: str, retry_after: str | None = None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `per_minute / 60` tokens per second."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self) -> float | None:
+        # Takes a token, or returns how long until one is available
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the time spent waiting."""
+        waited = 0.0
+        while (delay := self._take()) is not None:
+            time.sleep(delay)
+            waited += delay
+        return waited
+
+    async def acquire_async(self) -> float:
+        """`acquire` for the event loop: waits without blocking it."""
+        waited = 0.0
+        while (delay := self._take()) is not None:
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
+
+    def drain(self) -> None:
+        # After a 429 every caller should slow down, not just the one that got it
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)
+
+
+def _status(e: Exception) -> int | None:
+    from gspread.exceptions import APIError
+
+    if isinstance(e, SheetsHTTPError):
+        return e.status
+    if isinstance(e, APIError):
+        return getattr(e, "code", None) or getattr(e.response, "status_code", None)
+    return None
+
+
+def _retry_after(e: Exception) -> float | None:
+    if isinstance(e, SheetsHTTPError):
+        value = e.retry_after
+    else:
+        response = getattr(e, "response", None)
+        value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class SheetsScheduler:
+    """Every Sheets call goes through `call("read" | "write", fn, ...)` (or `acall` for the async backend).
+
+    Calls are paced by one token bucket per quota (reads / writes per minute).
+    429 and 5xx answers and dropped connections are retried with jittered
+    exponential backoff (or the server's Retry-After); other error answers,
+    and gspread's PermissionError / SpreadsheetNotFound, raise
+    SheetsPermanentError at once.
+    """
+
+    def __init__(self, reads_per_minute: float = 60, writes_per_minute: float = 60, burst: int = 10,
+                 max_retries: int = 6, base_delay: float = 1.0, max_delay: float = 64.0):
+        self.buckets = {
+            "read": TokenBucket(reads_per_minute, burst),
+            "write": TokenBucket(writes_per_minute, burst),
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def configure(self, reads_per_minute: float, writes_per_minute: float, burst: int, max_retries: int):
+        self.__init__(reads_per_minute, writes_per_minute, burst, max_retries, self.base_delay, self.max_delay)
+
+    def _backoff(self, e: Exception, kind: str, name: str, attempt: int) -> float | None:
+        # Delay before the next attempt, or None once retries are used up; permanent errors raise
+        status = _status(e)
+        if status is not None and status not in RETRYABLE_STATUS:
+            raise SheetsPermanentError(f"{name}: HTTP {status}: {e}") from e
+        if attempt == self.max_retries:
+            return None
+        if status == 429:
+            self.buckets[kind].drain()
+        delay = _retry_after(e)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+        PROFILER.event("sheets.backoff", kind=kind, method=name, status=status,
+                       attempt=attempt + 1, delay_s=round(delay, 2))
+        return delay
+
+    def call(self, kind: str, fn, *args, **kwargs):
+        import requests
+        from gspread.exceptions import APIError, GSpreadException
+
+        bucket = self.buckets[kind]
+        name = getattr(fn, "__name__", "call")
+        for attempt in range(self.max_retries + 1):
+            waited = bucket.acquire()
+            if waited:
+                PROFILER.event("sheets.throttle", kind=kind, method=name, waited_s=round(waited, 3))
+            try:
+                with PROFILER.span("sheets.call", kind=kind, method=name):
+                    return fn(*args, **kwargs)
+            except (APIError, requests.ConnectionError, requests.Timeout) as e:
+                delay = self._backoff(e, kind, name, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+            except (PermissionError, GSpreadException) as e:
+                # gspread's own errors without an HTTP answer to classify, e.g. open_by_key on 403
+                # (PermissionError) or 404 (SpreadsheetNotFound)
+                raise SheetsPermanentError(f"{name}: {type(e).__name__}: {e}") from e
+
+    async def acall(self, kind: str, fn, *args, **kwargs):
+        """`call` for coroutine functions (the async backend): paced, retried and backed off on the event loop."""
+        import httpx
+
+        bucket = self.buckets[kind]
+        name = getattr(fn, "__name__", "call")
+        for attempt in range(self.max_retries + 1):
+            waited = await bucket.acquire_async()
+            if waited:
+                PROFILER.event("sheets.throttle", kind=kind, method=name, waited_s=round(waited, 3))
+            try:
+                with PROFILER.span("sheets.call", kind=kind, method=name):
+                    return await fn(*args, **kwargs)
+            except (SheetsHTTPError, httpx.TransportError) as e:
+                delay = self._backoff(e, kind, name, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+SHEETS = SheetsScheduler()
@@ -0,0 +1,73 @@
+import asyncio
+import inspect
+
+from profiling import PROFILER
+from sheets_scheduler import SheetsPermanentError
+
+
+# === Stage-level checkpoints for club retries ===
+class Checkpoint:
+    """Results of the stages of one club's export that already finished, kept across retries.
+
+    Every attempt runs the same stages in order; a stage found here returns its
+    stored result instead of running again, so a retry picks up at the stage
+    that failed (a Sheets error after a good fetch never fetches again).
+    Stages running in worker threads record and read results with `record` /
+    `get` directly.
+    """
+
+    def __init__(self):
+        self._done: dict[str, object] = {}
+        self.stage: str | None = None  # the stage running (or that last failed)
+        self.retries = 0
+
+    def __contains__(self, stage: str) -> bool:
+        return stage in self._done
+
+    def get(self, stage: str, default=None):
+        return self._done.get(stage, default)
+
+    def record(self, stage: str, result=None) -> None:
+        self._done[stage] = result
+
+    def seed(self, stage: str, result) -> None:
+        # Result produced outside the stages (e.g. a payload fetched up front)
+        self._done.setdefault(stage, result)
+
+    async def run(self, stage: str, fn, *args, **kwargs):
+        if stage in self._done:
+            return self._done[stage]
+        self.stage = stage
+        result = fn(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        self._done[stage] = result
+        return result
+
+
+async def retry_stages(title: str, attempt, max_retries: int, retry_delay: float,
+                       checkpoint: Checkpoint | None = None):
+    """Run `attempt(checkpoint)` until it succeeds, resuming each retry from the stage that failed.
+
+    Returns (True, result) on success and (False, None) once `max_retries`
+    attempts failed, or at once on a SheetsPermanentError (retrying cannot fix those).
+    """
+    checkpoint = checkpoint or Checkpoint()
+    for n in range(max_retries):
+        if n > 0:
+            print(f"\n⚡ Retrying {title} from '{checkpoint.stage}' (Attempt {n + 1}/{max_retries}) "
+                  f"after waiting {retry_delay}s...")
+            await asyncio.sleep(retry_delay)
+            checkpoint.retries = n
+        try:
+            return True, await attempt(checkpoint)
+        except SheetsPermanentError as e:
+            print(f"❌ {title} failed at '{checkpoint.stage}' (not retrying): {e}")
+            PROFILER.event("club.failed", club=title, at=checkpoint.stage, error=type(e).__name__)
+            return False, None
+        except Exception as e:
+            print(f"❌ {title} failed at '{checkpoint.stage}' on attempt {n + 1}: {e}")
+            PROFILER.event("club.retry", club=title, at=checkpoint.stage, attempt=n + 1, error=type(e).__name__)
+    print(f"    Final failure for {title} after {max_retries} attempts.")
+    PROFILER.event("club.failed", club=title, at=checkpoint.stage)
+    return False, None